@@ -6,6 +6,7 @@ Applies schema changes to an existing wsb.db:
 2. Creates tuning_runs table
 3. Adds prompt_config_id column to comments table
 4. Seeds default prompt config from current SYSTEM_PROMPT
+5. Runs ANALYZE on the affected tables so the query planner has statistics
 
 Safe to run multiple times (uses IF NOT EXISTS / try-except for ALTER).
 
@@ -24,14 +25,31 @@ from src.prompts import SYSTEM_PROMPT
 
 
 def migrate(db_path: str):
-    """Run the migration."""
+    """Run the migration in a single transaction (all steps or none)."""
     if not os.path.exists(db_path):
         print(f"Error: Database not found: {db_path}")
         sys.exit(1)
 
-    conn = sqlite3.connect(db_path)
+    # Autocommit mode so BEGIN/COMMIT below are the only transaction boundaries
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    # PRAGMAs must run outside the transaction to take effect
     conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
 
+    conn.execute("BEGIN")
+    try:
+        _apply_migration(conn)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    print("\nMigration complete.")
+
+
+def _apply_migration(conn: sqlite3.Connection):
+    """Apply the schema changes and seed. Caller owns the transaction."""
     # 1. Create prompt_configs table
     conn.execute("""
         CREATE TABLE IF NOT EXISTS prompt_configs (
@@ -99,12 +117,13 @@ def migrate(db_path: str):
             raise
 
     # 4. Seed default prompt config (only if none exists)
-    existing = conn.execute(
-        "SELECT id FROM prompt_configs WHERE is_default = 1"
-    ).fetchone()
+    # COALESCE(..., 0): the scalar subquery stops at the first match; 0 = none
+    existing_id = conn.execute(
+        "SELECT COALESCE((SELECT id FROM prompt_configs WHERE is_default = 1 LIMIT 1), 0)"
+    ).fetchone()[0]
 
-    if existing:
-        print(f"  Default prompt config: already exists (id={existing[0]})")
+    if existing_id:
+        print(f"  Default prompt config: already exists (id={existing_id})")
     else:
         conn.execute("""
             INSERT INTO prompt_configs (name, system_prompt, provider, model,
@@ -113,9 +132,11 @@ def migrate(db_path: str):
         """, ("default", SYSTEM_PROMPT))
         print("  Default prompt config: seeded")
 
-    conn.commit()
-    conn.close()
-    print("\nMigration complete.")
+    # 5. Refresh planner statistics for the new/changed tables
+    conn.execute("ANALYZE prompt_configs")
+    conn.execute("ANALYZE tuning_runs")
+    conn.execute("ANALYZE comments")
+    print("  Planner statistics: updated")
 
 
 def main():
@@ -13,32 +13,29 @@ Requires env var: OPENAI_API_KEY
 
 import argparse
 import asyncio
-import json
 import os
 import sqlite3
 import sys
 import time
+from collections import Counter
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_ROOT = Path(__file__).resolve().parents[2]  # project-workspace/
+sys.path.insert(0, str(_ROOT))
 
-def _load_dotenv():
-    """Load .env file into os.environ if it exists."""
-    env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".env")
-    if os.path.exists(env_path):
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, value = line.partition("=")
-                    os.environ.setdefault(key.strip(), value.strip())
+from src.env import load_dotenv_once
 
-_load_dotenv()
+load_dotenv_once()
 
 from src.ai_dedup import partition_for_analysis
 from src.ai_batch import process_comments_in_batches, commit_analysis_batch
 from src.market_context import fetch_market_context, format_market_context, should_include_context
 from src.tuning import get_or_create_prompt_config, get_default_prompt_config
 from src.prompts import SYSTEM_PROMPT
+from src.json_io import load_json
+from src.sqlite_pragmas import apply_pragmas
 
 
 # GPT-4o-mini pricing (per 1M tokens)
@@ -46,13 +43,18 @@ COST_PER_1M_INPUT = 0.15
 COST_PER_1M_OUTPUT = 0.60
 AVG_PROMPT_TOKENS = 550
 AVG_COMPLETION_TOKENS = 100
+_COST_PER_COMMENT = (
+    AVG_PROMPT_TOKENS * COST_PER_1M_INPUT + AVG_COMPLETION_TOKENS * COST_PER_1M_OUTPUT
+) / 1_000_000
+
+# Results are written while analysis continues: every N results or T seconds
+WRITE_FLUSH_SIZE = 100
+WRITE_FLUSH_SECONDS = 1.0
 
 
 def estimate_cost(comment_count: int) -> float:
     """Estimate OpenAI API cost for analyzing comments."""
-    input_cost = (comment_count * AVG_PROMPT_TOKENS * COST_PER_1M_INPUT) / 1_000_000
-    output_cost = (comment_count * AVG_COMPLETION_TOKENS * COST_PER_1M_OUTPUT) / 1_000_000
-    return input_cost + output_cost
+    return comment_count * _COST_PER_COMMENT
 
 
 def open_db(db_path: str) -> sqlite3.Connection:
@@ -62,17 +64,94 @@ def open_db(db_path: str) -> sqlite3.Connection:
         print("Run store.py first to create it.")
         sys.exit(1)
 
-    conn = sqlite3.connect(db_path)
+    # Autocommit mode: the write phase manages its own BEGIN/COMMIT, and the
+    # larger statement cache keeps the batch INSERT/UPDATE statements prepared.
+    # check_same_thread=False lets _writer flush from a worker thread; only one
+    # thread uses the connection at a time (the loop waits on each flush).
+    conn = sqlite3.connect(db_path, cached_statements=256, isolation_level=None,
+                           check_same_thread=False)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
-    conn.execute("PRAGMA journal_mode = WAL")
+    apply_pragmas(conn, busy_timeout=5000, wal_autocheckpoint=1000)
     return conn
 
 
+# to_analyze.json fields (always written by store.py) and parsed AI result
+# fields (all required by parse_ai_response), in _MERGED_KEYS order
+_COMMENT_FIELDS = itemgetter(
+    "reddit_id", "post_db_id", "author", "body", "author_trust_score",
+    "score", "depth", "created_utc", "prioritization_score",
+)
+_RESULT_FIELDS = itemgetter(
+    "sentiment", "sarcasm_detected", "has_reasoning", "reasoning_summary",
+    "confidence", "tickers", "ticker_sentiments",
+)
+_MERGED_KEYS = (
+    "reddit_id", "post_id", "author", "body", "author_trust_score",  # post_id = DB FK from store.py
+    "score", "depth", "created_utc", "prioritization_score",
+    "sentiment", "sarcasm_detected", "has_reasoning", "reasoning_summary",
+    "ai_confidence", "tickers", "ticker_sentiments",
+)
+
+
+def _merge_result(comment_dict: dict, ai_result: dict) -> dict:
+    """Merge a to_analyze.json comment with its AI result for commit_analysis_batch."""
+    return dict(zip(_MERGED_KEYS, _COMMENT_FIELDS(comment_dict) + _RESULT_FIELDS(ai_result)))
+
+
+def _store_results(conn: sqlite3.Connection, run_id: int, pending: list,
+                   prompt_config_id) -> None:
+    """Write (comment, result) pairs in one explicit transaction.
+
+    The connection is in autocommit mode (isolation_level=None), so BEGIN
+    IMMEDIATE/COMMIT are the only transaction boundaries. BEGIN IMMEDIATE takes
+    the writer lock up front (waiting up to busy_timeout), so the transaction
+    can't hit SQLITE_BUSY part-way through. commit_analysis_batch runs with
+    commit=False so a failing write is rolled back via its savepoint.
+    """
+    merged_results = [_merge_result(c, r) for c, r in pending]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        commit_analysis_batch(conn, run_id, merged_results, prompt_config_id, commit=False)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+async def _writer(conn: sqlite3.Connection, run_id: int, queue: asyncio.Queue,
+                  prompt_config_id) -> None:
+    """Drain (comment, result) pairs from queue into SQLite until a None sentinel.
+
+    Flushes every WRITE_FLUSH_SIZE results or WRITE_FLUSH_SECONDS, whichever
+    comes first. Each flush runs in a worker thread, so waiting on the database
+    lock (up to busy_timeout) doesn't stall in-flight OpenAI requests.
+    """
+    loop = asyncio.get_running_loop()
+    pending = []
+    deadline = loop.time() + WRITE_FLUSH_SECONDS
+    done = False
+
+    while not done:
+        try:
+            item = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            item = ()
+        if item is None:
+            done = True
+        elif item:
+            pending.append(item)
+
+        if pending and (done or len(pending) >= WRITE_FLUSH_SIZE or loop.time() >= deadline):
+            await asyncio.to_thread(_store_results, conn, run_id, pending, prompt_config_id)
+            pending = []
+        if loop.time() >= deadline:
+            deadline = loop.time() + WRITE_FLUSH_SECONDS
+
+
 async def run_analysis(input_path: str, db_path: str, skip_confirm: bool):
     """Run AI sentiment analysis on comments."""
-    with open(input_path) as f:
-        data = json.load(f)
+    data = load_json(input_path)
 
     run_id = data["metadata"]["run_id"]
     comments = data["comments"]
@@ -136,12 +215,23 @@ async def run_analysis(input_path: str, db_path: str, skip_confirm: bool):
     except Exception as e:
         print(f"  Market context fetch failed ({e}) — proceeding without context")
 
-    # Run AI analysis
-    print(f"\nProcessing {len(analyze_list)} comments in batches of 5...")
+    # Run AI analysis; results stream to the writer as each comment completes,
+    # so database writes overlap the remaining OpenAI requests
+    print(f"\nProcessing {len(analyze_list)} comments, up to 5 requests at a time...")
     start_time = time.time()
 
-    results = await process_comments_in_batches(analyze_list, run_id,
-                                                market_context=market_context_str)
+    queue: asyncio.Queue = asyncio.Queue()
+    writer_task = asyncio.create_task(_writer(conn, run_id, queue, prompt_config_id))
+
+    async def _produce():
+        try:
+            return await process_comments_in_batches(analyze_list, run_id,
+                                                     market_context=market_context_str,
+                                                     queue=queue)
+        finally:
+            await queue.put(None)  # Tell the writer no more results are coming
+
+    results, _ = await asyncio.gather(_produce(), writer_task)
 
     elapsed = time.time() - start_time
     successful = len(results)
@@ -152,56 +242,18 @@ async def run_analysis(input_path: str, db_path: str, skip_confirm: bool):
     if failed:
         print(f"  Failed/skipped: {failed}")
 
-    # Store results in batches
-    if results:
-        print("Storing results to database...")
-        # results from process_comments_in_batches are (comment, result) tuples
-        # Merge into dicts for commit_analysis_batch
-        merged_results = []
-        for comment_dict, ai_result in results:
-            merged = {
-                "reddit_id": comment_dict.get("reddit_id"),
-                "post_id": comment_dict.get("post_db_id"),  # DB FK from store.py
-                "author": comment_dict.get("author", "unknown"),
-                "body": comment_dict.get("body", ""),
-                "author_trust_score": comment_dict.get("author_trust_score", 0.5),
-                "score": comment_dict.get("score", 0),
-                "depth": comment_dict.get("depth", 0),
-                "created_utc": comment_dict.get("created_utc", 0),
-                "prioritization_score": comment_dict.get("prioritization_score", 0.0),
-                "sentiment": ai_result.get("sentiment"),
-                "sarcasm_detected": ai_result.get("sarcasm_detected", False),
-                "has_reasoning": ai_result.get("has_reasoning", False),
-                "reasoning_summary": ai_result.get("reasoning_summary"),
-                "ai_confidence": ai_result.get("confidence"),
-                "tickers": ai_result.get("tickers", []),
-                "ticker_sentiments": ai_result.get("ticker_sentiments", []),
-            }
-            merged_results.append(merged)
-
-        # Commit in batches of 5
-        batch_size = 5
-        for i in range(0, len(merged_results), batch_size):
-            batch = merged_results[i:i + batch_size]
-            commit_analysis_batch(conn, run_id, batch, prompt_config_id)
-
     # Update analysis run status
     conn.execute(
         "UPDATE analysis_runs SET status = ?, completed_at = datetime('now') WHERE id = ?",
         ("complete", run_id)
     )
-    conn.commit()
+    # Refresh planner stats if this run made them stale (no-op otherwise)
+    conn.execute("PRAGMA optimize")
     conn.close()
 
     # Summary
-    tickers_found = set()
-    sentiments = {"bullish": 0, "bearish": 0, "neutral": 0}
-    for _, ai_result in results:
-        for t in ai_result.get("tickers", []):
-            tickers_found.add(t)
-        s = ai_result.get("sentiment", "neutral")
-        if s in sentiments:
-            sentiments[s] += 1
+    tickers_found = set(chain.from_iterable(r.get("tickers") or () for _, r in results))
+    sentiments = Counter(r.get("sentiment", "neutral") for _, r in results)
 
     print(f"\nRun #{run_id} complete:")
     print(f"  Comments analyzed: {successful}")
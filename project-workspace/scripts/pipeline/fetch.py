@@ -13,27 +13,20 @@ Also requires OPENAI_API_KEY unless --skip-images is set.
 
 import argparse
 import asyncio
-import json
 import os
 import sys
-from dataclasses import asdict
 from datetime import datetime, timezone
+from pathlib import Path
 
 # Add project root to path so src.* imports work
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_ROOT = Path(__file__).resolve().parents[2]  # project-workspace/
+sys.path.insert(0, str(_ROOT))
 
-def _load_dotenv():
-    """Load .env file into os.environ if it exists."""
-    env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".env")
-    if os.path.exists(env_path):
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, value = line.partition("=")
-                    os.environ.setdefault(key.strip(), value.strip())
+from src.env import load_dotenv_once
 
-_load_dotenv()
+load_dotenv_once()
+
+from src.json_io import dump_json
 
 
 def check_env_vars(skip_images: bool) -> list[str]:
@@ -44,9 +37,22 @@ def check_env_vars(skip_images: bool) -> list[str]:
     return [v for v in required if not os.environ.get(v)]
 
 
+# Max concurrent per-post comment fetches (keeps within Reddit rate limits)
+FETCH_CONCURRENCY = 5
+
+
+async def _fetch_one(post, sem: asyncio.Semaphore, reddit, comments: int) -> None:
+    """Fetch comments for one post under the concurrency semaphore."""
+    from src.reddit import fetch_comments
+
+    async with sem:
+        submission = await reddit.submission(post.reddit_id)
+        post.comments = await fetch_comments(submission, limit=comments)
+
+
 async def run_fetch(limit: int, comments: int, skip_images: bool, output: str):
     """Fetch posts and comments from Reddit."""
-    from src.reddit import get_reddit_client, fetch_hot_posts, fetch_comments
+    from src.reddit import get_reddit_client, fetch_hot_posts
 
     # Patch out image analysis if --skip-images
     if skip_images:
@@ -66,14 +72,14 @@ async def run_fetch(limit: int, comments: int, skip_images: bool, output: str):
         posts = await fetch_hot_posts(reddit, subreddit_name="wallstreetbets", limit=limit)
         print(f"  Got {len(posts)} posts")
 
+        print(f"Fetching comments for {len(posts)} posts ({FETCH_CONCURRENCY} at a time)...")
+        sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+        await asyncio.gather(*[_fetch_one(p, sem, reddit, comments) for p in posts])
+
         total_comments = 0
         for i, post in enumerate(posts, 1):
-            print(f"  [{i}/{len(posts)}] Fetching comments for: {post.title[:60]}...")
-            submission = await reddit.submission(post.reddit_id)
-            post_comments = await fetch_comments(submission, limit=comments)
-            post.comments = post_comments
-            total_comments += len(post_comments)
-            print(f"    {len(post_comments)} comments fetched")
+            total_comments += len(post.comments)
+            print(f"  [{i}/{len(posts)}] {len(post.comments)} comments: {post.title[:60]}")
 
         await reddit.close()
 
@@ -81,6 +87,17 @@ async def run_fetch(limit: int, comments: int, skip_images: bool, output: str):
         images_found = sum(len(p.image_urls) for p in posts)
         images_analyzed = sum(len(p.image_urls) for p in posts if p.image_analysis)
 
+        # Vision output goes to a sidecar file keyed by post reddit_id; scoring
+        # never reads it, so fetched.json carries only the light fields
+        images_output = os.path.splitext(output)[0] + ".images.json"
+        images = {
+            p.reddit_id: {"image_urls": p.image_urls, "image_analysis": p.image_analysis}
+            for p in posts if p.image_urls
+        }
+        for p in posts:
+            p.image_urls = []
+            p.image_analysis = None
+
         output_data = {
             "metadata": {
                 "subreddit": "wallstreetbets",
@@ -90,18 +107,20 @@ async def run_fetch(limit: int, comments: int, skip_images: bool, output: str):
                 "images_found": images_found,
                 "images_analyzed": images_analyzed,
                 "skip_images": skip_images,
+                "images_file": os.path.basename(images_output),  # relative to this file
             },
-            "posts": [asdict(post) for post in posts],
+            "posts": posts,
         }
 
         os.makedirs(os.path.dirname(output), exist_ok=True)
-        with open(output, "w") as f:
-            json.dump(output_data, f, indent=2, default=str)
+        dump_json(output_data, output)
+        dump_json(images, images_output)
 
         print(f"\nFetched {len(posts)} posts, {total_comments} comments")
         if not skip_images:
             print(f"  Images found: {images_found}, analyzed: {images_analyzed}")
         print(f"  Output: {output}")
+        print(f"  Images: {images_output}")
 
     finally:
         if skip_images:
@@ -12,27 +12,20 @@ No API keys required. Uses the local database for author trust scores if availab
 """
 
 import argparse
-import json
 import os
 import sqlite3
 import sys
-from dataclasses import asdict
+from pathlib import Path
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_ROOT = Path(__file__).resolve().parents[2]  # project-workspace/
+sys.path.insert(0, str(_ROOT))
 
-def _load_dotenv():
-    """Load .env file into os.environ if it exists."""
-    env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".env")
-    if os.path.exists(env_path):
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, value = line.partition("=")
-                    os.environ.setdefault(key.strip(), value.strip())
+from src.env import load_dotenv_once
 
-_load_dotenv()
+load_dotenv_once()
 
+from src.json_io import dump_json, load_json
+from src.sqlite_pragmas import apply_pragmas
 from src.models.reddit_models import ProcessedPost, ProcessedComment, ParentChainEntry
 from src.scoring import (
     score_financial_keywords,
@@ -42,29 +35,29 @@ from src.scoring import (
 )
 
 
+def _fast_pce(entry: dict) -> ParentChainEntry:
+    """Build a ParentChainEntry from its JSON dict, bypassing the dataclass __init__."""
+    pce = ParentChainEntry.__new__(ParentChainEntry)
+    pce.__dict__.update(entry)
+    return pce
+
+
+def _fast_comment(cd: dict) -> ProcessedComment:
+    """Build a ProcessedComment from its JSON dict, bypassing the dataclass __init__.
+
+    Scoring fields missing from the dict fall back to the class-level defaults.
+    """
+    comment = ProcessedComment.__new__(ProcessedComment)
+    comment.__dict__.update(cd)
+    comment.parent_chain = [_fast_pce(entry) for entry in cd.get("parent_chain", ())]
+    return comment
+
+
 def reconstruct_posts(data: dict) -> list[ProcessedPost]:
     """Reconstruct ProcessedPost objects from JSON data."""
     posts = []
     for pd in data["posts"]:
-        comments = []
-        for cd in pd.get("comments", []):
-            parent_chain = [
-                ParentChainEntry(**entry)
-                for entry in cd.get("parent_chain", [])
-            ]
-            comments.append(ProcessedComment(
-                reddit_id=cd["reddit_id"],
-                post_id=cd["post_id"],
-                author=cd["author"],
-                body=cd["body"],
-                score=cd["score"],
-                depth=cd["depth"],
-                created_utc=cd["created_utc"],
-                priority_score=cd.get("priority_score", 0.0),
-                financial_score=cd.get("financial_score", 0.0),
-                author_trust_score=cd.get("author_trust_score", 0.0),
-                parent_chain=parent_chain,
-            ))
+        comments = [_fast_comment(cd) for cd in pd.get("comments", [])]
         posts.append(ProcessedPost(
             reddit_id=pd["reddit_id"],
             title=pd["title"],
@@ -78,14 +71,30 @@ def reconstruct_posts(data: dict) -> list[ProcessedPost]:
     return posts
 
 
+def relocate_images_file(images_file: str, input_path: str, output_path: str) -> str:
+    """Re-anchor metadata["images_file"] from input_path's directory to output_path's.
+
+    images_file is relative to the stage file that names it, so passing it
+    through to a file in another directory needs the path rewritten.
+    """
+    sidecar = os.path.join(os.path.dirname(os.path.abspath(input_path)), images_file)
+    return os.path.relpath(sidecar, os.path.dirname(os.path.abspath(output_path)))
+
+
 def get_db_connection() -> sqlite3.Connection | None:
     """Try to open the database for author trust lookups. Returns None if unavailable."""
     db_path = os.environ.get("DB_PATH", "./data/wsb.db")
     if not os.path.exists(db_path):
         return None
     try:
-        conn = sqlite3.connect(db_path)
+        # Autocommit: lookup_author_trust_scores writes to a TEMP table (CREATE,
+        # DELETE, INSERT) inside its own SAVEPOINT, which is the only transaction
+        # on this connection; nothing in the main database is modified. The
+        # statement cache keeps those statements prepared. apply_pragmas also
+        # switches the database file to WAL (a persistent setting).
+        conn = sqlite3.connect(db_path, cached_statements=256, isolation_level=None)
         conn.row_factory = sqlite3.Row
+        apply_pragmas(conn, busy_timeout=5000)
         return conn
     except sqlite3.Error:
         return None
@@ -105,8 +114,7 @@ def main():
         print("Run fetch.py first to create it.")
         sys.exit(1)
 
-    with open(args.input) as f:
-        data = json.load(f)
+    data = load_json(args.input)
 
     posts = reconstruct_posts(data)
     original_count = sum(len(p.comments) for p in posts)
@@ -116,7 +124,7 @@ def main():
     # Author trust lookup
     conn = get_db_connection()
     if conn:
-        all_authors = list({c.author for p in posts for c in p.comments})
+        all_authors = {c.author for p in posts for c in p.comments}
         trust_map = lookup_author_trust_scores(conn, all_authors)
         print(f"  Looked up trust scores for {len(all_authors)} unique authors")
         conn.close()
@@ -133,12 +141,10 @@ def main():
             # Author trust
             comment.author_trust_score = trust_map.get(comment.author, 0.5)
 
-            # Engagement proxy: score / (depth + 1)
-            comment._engagement = comment.score / (comment.depth + 1)
-
         # Normalize engagement across this post's comments
+        # Engagement proxy: score / (depth + 1)
         if post.comments:
-            comment_dicts = [{"engagement": c._engagement} for c in post.comments]
+            comment_dicts = [{"engagement": c.score / (c.depth + 1)} for c in post.comments]
             normalized = normalize_engagement_scores(comment_dicts)
             for comment, norm in zip(post.comments, normalized):
                 comment.engagement_normalized = norm["engagement_normalized"]
@@ -147,21 +153,24 @@ def main():
     posts = score_and_select_comments(posts, top_n=args.top_n)
     retained_count = sum(len(p.comments) for p in posts)
 
+    metadata = data["metadata"]
+    if metadata.get("images_file"):
+        metadata["images_file"] = relocate_images_file(metadata["images_file"], args.input, args.output)
+
     # Serialize
     output_data = {
         "metadata": {
-            **data["metadata"],
+            **metadata,
             "scored_at": __import__("datetime").datetime.now(__import__("datetime").timezone.utc).isoformat(),
             "original_comments": original_count,
             "retained_comments": retained_count,
             "top_n": args.top_n,
         },
-        "posts": [asdict(post) for post in posts],
+        "posts": posts,
     }
 
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
-    with open(args.output, "w") as f:
-        json.dump(output_data, f, indent=2, default=str)
+    dump_json(output_data, args.output)
 
     print(f"\nScored {original_count} comments, kept {retained_count} (top {args.top_n}/post)")
     print(f"  Output: {args.output}")
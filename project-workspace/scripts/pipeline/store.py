@@ -6,36 +6,100 @@ and comments to the database, then writes a JSON file with the comment data
 needed for the AI analysis stage.
 
 Usage:
-    python scripts/pipeline/store.py [-i data/pipeline/scored.json] [-o data/pipeline/to_analyze.json] [--db-path ./data/wsb.db]
+    python scripts/pipeline/store.py [-i data/pipeline/scored.json] [-o data/pipeline/to_analyze.json] [--db-path ./data/wsb.db] [--pretty]
 
 No API keys required. Creates the database and schema if they don't exist.
 """
 
 import argparse
-import json
 import os
 import sqlite3
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterator
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_ROOT = Path(__file__).resolve().parents[2]  # project-workspace/
+sys.path.insert(0, str(_ROOT))
 
-def _load_dotenv():
-    """Load .env file into os.environ if it exists."""
-    env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".env")
-    if os.path.exists(env_path):
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, value = line.partition("=")
-                    os.environ.setdefault(key.strip(), value.strip())
+from src.env import load_dotenv_once
 
-_load_dotenv()
+load_dotenv_once()
 
+from src.json_io import dump_json, load_json, stream_json
+from src.sqlite_pragmas import apply_pragmas
 from src.storage import store_posts_and_comments
 from src.prompts import format_parent_chain
 
+SCHEMA_PATH = _ROOT / "src" / "backend" / "db" / "schema.sql"
+
+# Stamped into PRAGMA user_version once the schema exists
+SCHEMA_VERSION = 1
+
+# Posts parsed, stored, and converted per batch. Only one batch of full posts
+# (with nested comments and parent chains) is resident at a time.
+STORE_BATCH_SIZE = 100
+
+
+def load_images(metadata: dict, input_path: str) -> dict:
+    """Load image_urls/image_analysis from fetch's sidecar file, keyed by post reddit_id.
+
+    fetch.py writes vision output to a separate .images.json (named in
+    metadata["images_file"], relative to the stage file) so score.py doesn't
+    carry it. Older files with inline image data have no sidecar and get an
+    empty mapping. A sidecar that is named but missing raises
+    FileNotFoundError rather than storing every post without its images.
+    """
+    images_file = metadata.get("images_file")
+    if not images_file:
+        return {}
+    path = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(input_path)), images_file))
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Image sidecar not found: {path}")
+    return load_json(path)
+
+
+def iter_post_batches(posts: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    """Group a lazy post iterator into lists of at most size posts."""
+    while batch := list(islice(posts, size)):
+        yield batch
+
+
+def prefetch_post_batches(path: str, size: int) -> tuple[dict, Iterator[list[dict]]]:
+    """Read the metadata and parse the first post batch up front.
+
+    Run on a worker thread, this is the part of the parse that can overlap
+    with opening the database; later batches still stream lazily.
+    """
+    metadata, posts = stream_json(path, "metadata", "posts")
+    first = list(islice(posts, size))
+    batches = iter_post_batches(posts, size)
+    return metadata, chain([first], batches) if first else batches
+
+
+def _format_parent_chain(parent_chain: list[dict], cache: dict[tuple, str]) -> str:
+    """format_parent_chain, memoized on the chain's ancestor ids.
+
+    Sibling replies carry identical parent chains, and an ancestor's body and
+    author never change, so the ids alone identify the formatted string.
+    """
+    if not parent_chain:
+        return ""
+    key = tuple(entry["id"] for entry in parent_chain)
+    formatted = cache.get(key)
+    if formatted is None:
+        formatted = cache[key] = format_parent_chain(parent_chain)
+    return formatted
+
+
+@lru_cache(maxsize=1)
+def _schema_sql() -> str:
+    """Read schema.sql once per process, on the first bootstrap that needs it."""
+    return SCHEMA_PATH.read_text()
+
 
 def ensure_db(db_path: str) -> sqlite3.Connection:
     """Open (and optionally initialize) the database."""
@@ -43,27 +107,41 @@ def ensure_db(db_path: str) -> sqlite3.Connection:
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
-    conn.execute("PRAGMA journal_mode = WAL")
-
-    # Check if schema exists
+    # NORMAL can lose the last commits on power failure but never corrupts the
+    # database; this stage is re-runnable from scored.json, so a crash just
+    # means running it again. Checkpoints are spaced out to 10000 pages since
+    # this stage is one long burst of inserts.
+    apply_pragmas(conn, wal_autocheckpoint=10000)
+
+    # user_version is stamped once the schema is known to exist, so warm
+    # starts skip the sqlite_master scan
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return conn
+
+    # Check if schema exists (new database, or one created by another tool)
     tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
     table_names = {row["name"] for row in tables}
 
     if "analysis_runs" not in table_names:
         print("  Initializing database schema...")
-        schema_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "..", "..", "src", "backend", "db", "schema.sql"
-        )
-        with open(schema_path) as f:
-            schema_sql = f.read()
-        conn.executescript(schema_sql)
+        conn.executescript(_schema_sql())
         # Re-enable FKs after executescript resets them
         conn.execute("PRAGMA foreign_keys = ON")
 
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     return conn
 
 
+def write_output(output_data: dict, output_path: str, pretty: bool = False) -> None:
+    """Write the analyze input JSON, creating its directory if needed.
+
+    Compact by default since only analyze.py reads it; pretty=True indents
+    it for debugging.
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    dump_json(output_data, output_path, indent=pretty)
+
+
 def create_analysis_run(conn: sqlite3.Connection) -> int:
     """Create a new analysis_runs record and return its ID."""
     cursor = conn.execute(
@@ -81,87 +159,102 @@ def main():
     parser.add_argument("-i", "--input", default="data/pipeline/scored.json", help="Input JSON from score stage (default: data/pipeline/scored.json)")
     parser.add_argument("-o", "--output", default="data/pipeline/to_analyze.json", help="Output JSON for analyze stage (default: data/pipeline/to_analyze.json)")
     parser.add_argument("--db-path", default=None, help="SQLite database path (default: $DB_PATH or ./data/wsb.db)")
+    parser.add_argument("--pretty", action="store_true", help="Indent the output JSON for reading (default: compact)")
     args = parser.parse_args()
 
     db_path = args.db_path or os.environ.get("DB_PATH", "./data/wsb.db")
+    created_at = datetime.now(timezone.utc)  # One timestamp for the whole run
 
     if not os.path.exists(args.input):
         print(f"Error: Input file not found: {args.input}")
         print("Run score.py first to create it.")
         sys.exit(1)
 
-    with open(args.input) as f:
-        data = json.load(f)
-
-    posts = data["posts"]
-    total_comments = sum(len(p.get("comments", [])) for p in posts)
-
-    print(f"Loaded {len(posts)} posts with {total_comments} comments from {args.input}")
-
-    # Open/create database
+    print(f"Loading posts from {args.input}")
     print(f"  Database: {db_path}")
-    conn = ensure_db(db_path)
+
+    # Parse the metadata and first post batch on a worker thread while the
+    # database opens/bootstraps. The connection stays on the main thread
+    # (sqlite3 connections are bound to the thread that created them).
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        parse_future = executor.submit(prefetch_post_batches, args.input, STORE_BATCH_SIZE)
+        conn = ensure_db(db_path)
+        metadata, post_batches = parse_future.result()
+    try:
+        images = load_images(metadata, args.input)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        print("Keep fetch.py's .images.json with the stage files, or re-run fetch.py.")
+        sys.exit(1)
 
     # Create analysis run
     run_id = create_analysis_run(conn)
     print(f"  Created analysis run #{run_id}")
 
-    # Store posts and comments
-    print(f"  Storing {len(posts)} posts and {total_comments} comments...")
-    store_posts_and_comments(conn, run_id, posts)
-
-    # Build analyze input: look up DB post_ids and format for AI stage
+    # Store posts and comments batch by batch, building the analyze input as we go
     analyze_comments = []
-    for post in posts:
-        # Look up the DB post_id for this reddit_id
-        row = conn.execute(
-            "SELECT id FROM reddit_posts WHERE reddit_id = ?",
-            (post["reddit_id"],)
-        ).fetchone()
-
-        if not row:
-            print(f"  Warning: post {post['reddit_id']} not found in DB after store")
-            continue
-
-        post_db_id = row["id"]
-
-        for comment in post.get("comments", []):
-            parent_chain_formatted = format_parent_chain(comment.get("parent_chain", []))
-
-            analyze_comments.append({
-                "reddit_id": comment["reddit_id"],
-                "body": comment["body"],
-                "author": comment["author"],
-                "author_trust_score": comment.get("author_trust_score", 0.5),
-                "post_id": post["reddit_id"],
-                "post_db_id": post_db_id,
-                "post_title": post["title"],
-                "image_description": post.get("image_analysis"),
-                "parent_chain_formatted": parent_chain_formatted,
-                "score": comment.get("score", 0),
-                "depth": comment.get("depth", 0),
-                "created_utc": comment.get("created_utc", 0),
-                "prioritization_score": comment.get("priority_score", 0.0),
-            })
-
-    conn.close()
-
-    # Write analyze input JSON
+    total_posts = 0
+    total_comments = 0
+    for batch in post_batches:
+        total_posts += len(batch)
+        for post in batch:
+            post.update(images.get(post["reddit_id"], {}))
+            total_comments += len(post.get("comments", ()))
+
+        # One transaction per batch; a failing post only rolls back its own savepoint
+        with conn:
+            conn.execute("BEGIN")
+            post_db_ids = store_posts_and_comments(conn, run_id, batch, commit=False)
+
+        # Format for AI stage. Chains are only shared within a post, so the
+        # cache is scoped to the batch to keep it small.
+        chain_cache: dict[tuple, str] = {}
+        for post in batch:
+            post_db_id = post_db_ids.get(post["reddit_id"])
+            if post_db_id is None:
+                print(f"  Warning: post {post['reddit_id']} failed to store, skipping its comments")
+                continue
+
+            # Reuse the parsed comment dicts as analyze rows: the batch is
+            # discarded after this, so nothing else sees the mutation
+            post_reddit_id = post["reddit_id"]
+            post_title = post["title"]
+            image_description = post.get("image_analysis")
+            comments = post.get("comments", [])
+            for c in comments:
+                c["post_id"] = post_reddit_id
+                c["post_db_id"] = post_db_id
+                c["post_title"] = post_title
+                c["image_description"] = image_description
+                c["parent_chain_formatted"] = _format_parent_chain(c.pop("parent_chain", None), chain_cache)
+                c["prioritization_score"] = c.pop("priority_score", 0.0)
+                c.pop("financial_score", None)
+                c.setdefault("author_trust_score", 0.5)
+                c.setdefault("score", 0)
+                c.setdefault("depth", 0)
+                c.setdefault("created_utc", 0)
+            analyze_comments.extend(comments)
+
+        print(f"  Stored {total_posts} posts and {total_comments} comments...")
+
+    # Write analyze input JSON on a worker thread while the connection closes
+    # (closing the last WAL connection checkpoints the inserts just made)
     output_data = {
         "metadata": {
             "run_id": run_id,
             "comment_count": len(analyze_comments),
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": created_at,
             "db_path": db_path,
         },
         "comments": analyze_comments,
     }
 
-    os.makedirs(os.path.dirname(args.output), exist_ok=True)
-    with open(args.output, "w") as f:
-        json.dump(output_data, f, indent=2, default=str)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        write_future = executor.submit(write_output, output_data, args.output, args.pretty)
+        conn.close()
+        write_future.result()  # Re-raise any write error
 
-    print(f"\nCreated run #{run_id}, stored {len(posts)} posts + {total_comments} comments")
+    print(f"\nCreated run #{run_id}, stored {total_posts} posts + {total_comments} comments")
     print(f"  Analyze input: {args.output} ({len(analyze_comments)} comments ready for AI)")
 
 
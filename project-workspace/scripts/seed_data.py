@@ -2,19 +2,156 @@
 """
 WSB Analysis Tool - Development Seed Data Script
 Generates realistic mock data for frontend development.
-Idempotent: safe to run multiple times (uses INSERT OR IGNORE).
+Idempotent: safe to run multiple times (uses INSERT OR IGNORE or no-op upserts).
+All tables are seeded in a single transaction.
 """
 
 import sqlite3
 import os
 import random
 import sys
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta
+from itertools import chain
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sqlite_pragmas import apply_pragmas
+
 # Default database path (configurable via DB_PATH env var)
 DEFAULT_DB_PATH = "./data/wsb.db"
 
+# RNG seed for seed_price_history
+PRICE_HISTORY_SEED = 42
+
+# SQLite's default maximum number of bound parameters per statement
+_MAX_VARIABLES = 999
+
+# reddit_id of a seeded comment, used by is_seeded() to detect a completed seed
+_SEED_SENTINEL_COMMENT = "com001nvda"
+
+# One clock reading for the whole seed: relative dates and timestamps are
+# derived from it. created_at/fetched_at columns use SQLite's datetime('now').
+_NOW = datetime.now()
+_TODAY = _NOW.date()
+
+_SQL_INSERT_AUTHORS = """
+    INSERT OR IGNORE INTO authors
+    (username, first_seen, total_comments, high_quality_comments, avg_conviction_score,
+     avg_sentiment_accuracy, total_upvotes, flagged_comments, last_active)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_ANALYSIS_RUNS = """
+    INSERT OR IGNORE INTO analysis_runs
+    (status, current_phase, current_phase_label, progress_current, progress_total,
+     started_at, completed_at, error_message, signals_created, positions_opened, exits_triggered, warnings)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+"""
+
+_SQL_INSERT_REDDIT_POSTS = """
+    INSERT INTO reddit_posts
+    (reddit_id, title, selftext, upvotes, total_comments, image_urls, image_analysis, fetched_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(reddit_id) DO UPDATE SET reddit_id = excluded.reddit_id
+    RETURNING id
+"""
+
+_SQL_INSERT_SIGNALS = """
+    INSERT INTO signals
+    (signal_date, created_at, updated_at, ticker, signal_type, sentiment_score, prediction,
+     confidence, comment_count, has_reasoning, is_emergence, prior_7d_mentions,
+     distinct_users, position_opened)
+    VALUES (?, datetime('now'), datetime('now'), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(ticker, signal_type, signal_date) DO UPDATE SET ticker = excluded.ticker
+    RETURNING id, ticker, signal_type
+"""
+
+_SQL_INSERT_POSITIONS = """
+    INSERT OR IGNORE INTO positions
+    (portfolio_id, signal_id, ticker, instrument_type, signal_type, direction, confidence,
+     position_size, entry_date, entry_price, status, shares, shares_remaining,
+     stop_loss_price, take_profit_price, peak_price, trailing_stop_active, time_extension,
+     option_type, strike_price, expiration_date, contracts, contracts_remaining,
+     premium_paid, peak_premium, underlying_price_at_entry, exit_date, exit_reason, hold_days, realized_return_pct)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING id, status
+"""
+
+_SQL_INSERT_POSITION_EXITS = """
+    INSERT OR IGNORE INTO position_exits
+    (position_id, exit_date, exit_price, exit_reason, quantity_pct, shares_exited,
+     contracts_exited, realized_pnl, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+"""
+
+_SQL_INSERT_COMMENTS = """
+    INSERT INTO comments
+    (analysis_run_id, post_id, reddit_id, author, body, created_utc, score,
+     parent_comment_id, depth, prioritization_score, sentiment, sarcasm_detected,
+     has_reasoning, reasoning_summary, ai_confidence, author_trust_score, analyzed_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+    ON CONFLICT(reddit_id) DO UPDATE SET reddit_id = excluded.reddit_id
+    RETURNING id, reddit_id
+"""
+
+# Junction tables are inserted with _insert_values(), which appends one
+# copy of the row template per row to these prefixes
+_SQL_INSERT_SIGNAL_COMMENTS = """
+    INSERT OR IGNORE INTO signal_comments
+    (signal_id, comment_id, created_at)
+    VALUES """
+_SQL_SIGNAL_COMMENTS_ROW = "(?, ?, datetime('now'))"
+
+_SQL_INSERT_COMMENT_TICKERS = """
+    INSERT OR IGNORE INTO comment_tickers
+    (comment_id, ticker, sentiment, created_at)
+    VALUES """
+_SQL_COMMENT_TICKERS_ROW = "(?, ?, ?, datetime('now'))"
+
+_SQL_INSERT_EVALUATION_PERIODS = """
+    INSERT OR IGNORE INTO evaluation_periods
+    (portfolio_id, period_start, period_end, instrument_type, signal_type, status,
+     portfolio_return_pct, sp500_return_pct, relative_performance, beat_benchmark,
+     total_positions_closed, winning_positions, losing_positions, avg_return_pct,
+     signal_accuracy_pct, value_at_period_start, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+"""
+
+_SQL_INSERT_PRICE_HISTORY = """
+    INSERT OR IGNORE INTO price_history
+    (ticker, date, open, high, low, close, fetched_at)
+    VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
+"""
+
+
+def _insert_returning(cursor, sql, rows):
+    """Run an INSERT ... RETURNING statement per row and collect the returned rows.
+
+    executemany() discards RETURNING output, so each row is its own execute().
+    Upserts whose conflict clause is a no-op DO UPDATE return the existing
+    row's id on re-runs, so callers get ids for every row without a
+    follow-up SELECT.
+    """
+    return [cursor.execute(sql, row).fetchone() for row in rows]
+
+
+def _insert_values(cursor, sql_prefix, row_sql, rows):
+    """Insert rows with multi-row VALUES statements instead of one statement per row.
+
+    row_sql is the VALUES group for one row, e.g. "(?, ?, datetime('now'))".
+    Rows are chunked so each statement stays under SQLite's 999 bound
+    parameter limit.
+    """
+    if not rows:
+        return
+    rows_per_statement = _MAX_VARIABLES // row_sql.count("?")
+    for start in range(0, len(rows), rows_per_statement):
+        chunk = rows[start:start + rows_per_statement]
+        cursor.execute(sql_prefix + ", ".join([row_sql] * len(chunk)),
+                       list(chain.from_iterable(chunk)))
+
 
 def get_db_path():
     """Get database path from environment or use default."""
@@ -22,14 +159,20 @@ def get_db_path():
 
 
 def connect_db(db_path):
-    """Connect to SQLite database with foreign keys enabled."""
-    conn = sqlite3.connect(db_path)
+    """Connect to SQLite database with foreign keys enabled.
+
+    The statement cache is sized to keep every _SQL_INSERT_* statement and
+    the id lookups prepared for the whole run.
+    """
+    conn = sqlite3.connect(db_path, cached_statements=256)
     conn.execute("PRAGMA foreign_keys = ON")
-    conn.execute("PRAGMA journal_mode = WAL")
+    # Seed data is trivially re-creatable: SEED_UNSAFE=1 skips fsync entirely
+    synchronous = "OFF" if os.environ.get("SEED_UNSAFE") == "1" else "NORMAL"
+    apply_pragmas(conn, synchronous=synchronous)
     return conn
 
 
-def seed_authors(conn):
+def seed_authors(conn, commit=True, cursor=None):
     """Create 5+ authors with varied trust scores."""
     authors_data = [
         ("DeepValueHunter", "2025-11-15 10:00:00", 150, 95, 0.82, 0.68, 4520, 2, "2026-02-08 14:30:00"),
@@ -40,89 +183,73 @@ def seed_authors(conn):
         ("MemeStonkKing", "2025-11-28 11:00:00", 180, 85, 0.65, 0.48, 7200, 20, "2026-02-08 13:00:00"),
     ]
 
-    cursor = conn.cursor()
-    for username, first_seen, total, high_q, avg_conv, avg_acc, upvotes, flagged, last_active in authors_data:
-        cursor.execute("""
-            INSERT OR IGNORE INTO authors
-            (username, first_seen, total_comments, high_quality_comments, avg_conviction_score,
-             avg_sentiment_accuracy, total_upvotes, flagged_comments, last_active)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (username, first_seen, total, high_q, avg_conv, avg_acc, upvotes, flagged, last_active))
+    cursor = cursor or conn.cursor()
+    cursor.executemany(_SQL_INSERT_AUTHORS, authors_data)
 
-    conn.commit()
+    if commit:
+        conn.commit()
     return len(authors_data)
 
 
-def seed_analysis_runs(conn):
+def seed_analysis_runs(conn, commit=True, cursor=None):
     """Create 3 analysis runs: completed, failed, running."""
     runs_data = [
         # Completed run from 2 days ago
         ("completed", 7, "7b. Evaluation Periods", 10, 10,
-         (datetime.now() - timedelta(days=2, hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
-         (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d %H:%M:%S"),
+         (_NOW - timedelta(days=2, hours=1)).isoformat(sep=" ", timespec="seconds"),
+         (_NOW - timedelta(days=2)).isoformat(sep=" ", timespec="seconds"),
          None, 12, 8, 3, '[]'),
         # Failed run from yesterday
         ("failed", 3, "3. Analysis", 485, 1000,
-         (datetime.now() - timedelta(days=1, hours=2)).strftime("%Y-%m-%d %H:%M:%S"),
-         (datetime.now() - timedelta(days=1, hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+         (_NOW - timedelta(days=1, hours=2)).isoformat(sep=" ", timespec="seconds"),
+         (_NOW - timedelta(days=1, hours=1)).isoformat(sep=" ", timespec="seconds"),
          "OpenAI API rate limit exceeded", 0, 0, 0, '["openai_rate_limit"]'),
         # Running (in progress)
         ("running", 5, "5. Position Management", 8, 12,
-         (datetime.now() - timedelta(minutes=15)).strftime("%Y-%m-%d %H:%M:%S"),
+         (_NOW - timedelta(minutes=15)).isoformat(sep=" ", timespec="seconds"),
          None, None, 10, 7, 0, '["market_hours_skipped"]'),
     ]
 
-    cursor = conn.cursor()
-    for status, phase, label, curr, total, started, completed, error, signals, positions, exits, warnings in runs_data:
-        cursor.execute("""
-            INSERT OR IGNORE INTO analysis_runs
-            (status, current_phase, current_phase_label, progress_current, progress_total,
-             started_at, completed_at, error_message, signals_created, positions_opened, exits_triggered, warnings)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (status, phase, label, curr, total, started, completed, error, signals, positions, exits, warnings))
-
-    conn.commit()
+    cursor = cursor or conn.cursor()
     # Return the IDs we just created
-    cursor.execute("SELECT id FROM analysis_runs ORDER BY id")
-    return [row[0] for row in cursor.fetchall()]
+    run_ids = [row[0] for row in _insert_returning(cursor, _SQL_INSERT_ANALYSIS_RUNS, runs_data)]
 
+    if commit:
+        conn.commit()
+    return run_ids
 
-def seed_reddit_posts(conn):
+
+def seed_reddit_posts(conn, commit=True, cursor=None):
     """Create 5+ reddit posts."""
     posts_data = [
         ("abc123xyz", "NVDA earnings thread - what are your plays?",
          "NVDA reports after hours tomorrow. Share your positions and predictions.",
-         2850, 450, None, None, (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d %H:%M:%S")),
+         2850, 450, None, None, (_NOW - timedelta(days=2)).isoformat(sep=" ", timespec="seconds")),
         ("def456uvw", "GME is back baby! 🚀🚀🚀",
          "Volume is insane today. Someone knows something.",
-         5200, 820, None, None, (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")),
+         5200, 820, None, None, (_NOW - timedelta(days=1)).isoformat(sep=" ", timespec="seconds")),
         ("ghi789rst", "TSLA call holders, how we feeling?",
          "Holding 10x $250c 2/14. Down 30% but Elon tweet incoming I can feel it.",
-         1200, 380, None, None, (datetime.now() - timedelta(hours=8)).strftime("%Y-%m-%d %H:%M:%S")),
+         1200, 380, None, None, (_NOW - timedelta(hours=8)).isoformat(sep=" ", timespec="seconds")),
         ("jkl012opq", "AMD crushing Intel, time to load up?",
          "Market share gains across the board. This could run to $200.",
-         980, 210, None, None, (datetime.now() - timedelta(hours=6)).strftime("%Y-%m-%d %H:%M:%S")),
+         980, 210, None, None, (_NOW - timedelta(hours=6)).isoformat(sep=" ", timespec="seconds")),
         ("mno345lmn", "Daily Discussion Thread",
          "What are your moves tomorrow?",
-         4500, 1200, None, None, (datetime.now() - timedelta(hours=4)).strftime("%Y-%m-%d %H:%M:%S")),
+         4500, 1200, None, None, (_NOW - timedelta(hours=4)).isoformat(sep=" ", timespec="seconds")),
     ]
 
-    cursor = conn.cursor()
-    for reddit_id, title, selftext, upvotes, comments, img_url, img_analysis, fetched in posts_data:
-        cursor.execute("""
-            INSERT OR IGNORE INTO reddit_posts
-            (reddit_id, title, selftext, upvotes, total_comments, image_urls, image_analysis, fetched_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (reddit_id, title, selftext, upvotes, comments, img_url, img_analysis, fetched))
+    cursor = cursor or conn.cursor()
+    post_ids = [row[0] for row in _insert_returning(cursor, _SQL_INSERT_REDDIT_POSTS, posts_data)]
 
-    conn.commit()
-    cursor.execute("SELECT id FROM reddit_posts ORDER BY id")
-    return [row[0] for row in cursor.fetchall()]
+    if commit:
+        conn.commit()
+    return post_ids
 
 
-def seed_signals(conn):
+def seed_signals(conn, commit=True, cursor=None):
     """Create 12+ signals with varied tickers and types."""
-    today = date.today()
+    today = _TODAY
     signals_data = [
         # Quality signals
         (today - timedelta(days=3), "NVDA", "quality", 0.85, "bullish", 0.82, 8, True, False, 2, 4, False),
@@ -140,29 +267,33 @@ def seed_signals(conn):
         (today, "AAPL", "consensus", 0.55, "bearish", 0.52, 30, False, False, 1, 9, False),
     ]
 
-    cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cursor = cursor or conn.cursor()
+    signal_ids = _insert_returning(cursor, _SQL_INSERT_SIGNALS, [
+        (signal_date.isoformat(), *rest)
+        for signal_date, *rest in signals_data
+    ])
+
+    if commit:
+        conn.commit()
+    return signal_ids
+
+
+# Positions of the date columns in a positions_data tuple
+_POSITION_DATE_FIELDS = (8, 20, 26)  # entry_date, expiration_date, exit_date
 
-    for signal_date, ticker, sig_type, sentiment_score, prediction, confidence, \
-        comment_count, has_reasoning, is_emergence, prior_mentions, users, pos_opened in signals_data:
-        cursor.execute("""
-            INSERT OR IGNORE INTO signals
-            (signal_date, created_at, updated_at, ticker, signal_type, sentiment_score, prediction,
-             confidence, comment_count, has_reasoning, is_emergence, prior_7d_mentions,
-             distinct_users, position_opened)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (signal_date.strftime("%Y-%m-%d"), now, now, ticker, sig_type, sentiment_score,
-              prediction, confidence, comment_count, has_reasoning, is_emergence,
-              prior_mentions, users, pos_opened))
 
-    conn.commit()
-    cursor.execute("SELECT id, ticker, signal_type FROM signals ORDER BY id")
-    return cursor.fetchall()
+def _format_position(pos_data):
+    """Return a positions_data tuple with its date fields as ISO strings (None kept)."""
+    row = list(pos_data)
+    for i in _POSITION_DATE_FIELDS:
+        if row[i] is not None:
+            row[i] = row[i].isoformat()
+    return tuple(row)
 
 
-def seed_positions(conn, signal_ids):
+def seed_positions(conn, signal_ids, commit=True, cursor=None):
     """Create 10+ positions: mix of open/closed, stock/option, across portfolios."""
-    cursor = conn.cursor()
+    cursor = cursor or conn.cursor()
 
     # Get portfolio IDs
     cursor.execute("SELECT id, instrument_type, signal_type FROM portfolios ORDER BY id")
@@ -172,7 +303,7 @@ def seed_positions(conn, signal_ids):
         print("WARNING: No portfolios found. Run schema.sql and seed.sql first.")
         return 0
 
-    today = date.today()
+    today = _TODAY
     positions_data = [
         # Stocks Quality Portfolio - Mix of open and closed
         (portfolios[0][0], signal_ids[0][0], "NVDA", "stock", "quality", "long", 0.82, 5000.0,
@@ -229,71 +360,46 @@ def seed_positions(conn, signal_ids):
          None, None, None, None),
     ]
 
-    count = 0
-    for pos_data in positions_data:
-        (port_id, sig_id, ticker, inst_type, sig_type, direction, confidence, pos_size,
-         entry_date, entry_price, status, shares, shares_rem, stop_loss, take_profit, peak_price,
-         trailing_active, time_ext, opt_type, strike, expiration, contracts, contracts_rem,
-         premium_paid, peak_premium, underlying_entry, exit_date, exit_reason, hold_days, ret_pct) = pos_data
-
-        cursor.execute("""
-            INSERT OR IGNORE INTO positions
-            (portfolio_id, signal_id, ticker, instrument_type, signal_type, direction, confidence,
-             position_size, entry_date, entry_price, status, shares, shares_remaining,
-             stop_loss_price, take_profit_price, peak_price, trailing_stop_active, time_extension,
-             option_type, strike_price, expiration_date, contracts, contracts_remaining,
-             premium_paid, peak_premium, underlying_price_at_entry, exit_date, exit_reason, hold_days, realized_return_pct)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (port_id, sig_id, ticker, inst_type, sig_type, direction, confidence, pos_size,
-              entry_date.strftime("%Y-%m-%d"), entry_price, status, shares, shares_rem, stop_loss,
-              take_profit, peak_price, trailing_active, time_ext, opt_type, strike,
-              expiration.strftime("%Y-%m-%d") if expiration else None, contracts, contracts_rem,
-              premium_paid, peak_premium, underlying_entry,
-              exit_date.strftime("%Y-%m-%d") if exit_date else None, exit_reason, hold_days, ret_pct))
-        count += 1
-
-    conn.commit()
-    cursor.execute("SELECT id, status FROM positions WHERE status = 'closed' ORDER BY id")
-    return cursor.fetchall()
-
-
-def seed_position_exits(conn, closed_positions):
+    rows = [_format_position(pos_data) for pos_data in positions_data]
+    inserted = _insert_returning(cursor, _SQL_INSERT_POSITIONS, rows)
+
+    if commit:
+        conn.commit()
+    return [row for row in inserted if row[1] == "closed"]
+
+
+def seed_position_exits(conn, closed_positions, commit=True, cursor=None):
     """Create position_exits for closed positions with 4+ exit reason types."""
     exits_data = [
         # Position 1: NVDA stock - take_profit (partial exit 50%)
-        (closed_positions[0][0], date.today() - timedelta(days=1), 534.05, "take_profit", 0.50, 5, None, 242.75),
+        (closed_positions[0][0], _TODAY - timedelta(days=1), 534.05, "take_profit", 0.50, 5, None, 242.75),
         # Position 1: NVDA stock - trailing_stop (remaining 50%)
-        (closed_positions[0][0], date.today() - timedelta(days=1), 534.05, "trailing_stop", 0.50, 5, None, 242.75),
+        (closed_positions[0][0], _TODAY - timedelta(days=1), 534.05, "trailing_stop", 0.50, 5, None, 242.75),
 
         # Position 2: GME stock - stop_loss (full 100%)
-        (closed_positions[1][0], date.today() - timedelta(days=1), 22.32, "stop_loss", 1.0, 141, None, -350.00),
+        (closed_positions[1][0], _TODAY - timedelta(days=1), 22.32, "stop_loss", 1.0, 141, None, -350.00),
 
         # Position 3: TSLA option - take_profit (partial 50%)
-        (closed_positions[2][0], date.today(), 12.40, "take_profit", 0.50, None, 2, 620.00),
+        (closed_positions[2][0], _TODAY, 12.40, "take_profit", 0.50, None, 2, 620.00),
         # Position 3: TSLA option - trailing_stop (remaining 50%)
-        (closed_positions[2][0], date.today(), 11.80, "trailing_stop", 0.50, None, 1, 560.00),
+        (closed_positions[2][0], _TODAY, 11.80, "trailing_stop", 0.50, None, 1, 560.00),
 
         # Position 4: GME option - manual_close (full 100%)
-        (closed_positions[3][0], date.today() - timedelta(days=1), 1.75, "manual_close", 1.0, None, 5, -875.00),
+        (closed_positions[3][0], _TODAY - timedelta(days=1), 1.75, "manual_close", 1.0, None, 5, -875.00),
     ]
 
-    cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    for pos_id, exit_date, exit_price, exit_reason, qty_pct, shares_exit, contracts_exit, pnl in exits_data:
-        cursor.execute("""
-            INSERT OR IGNORE INTO position_exits
-            (position_id, exit_date, exit_price, exit_reason, quantity_pct, shares_exited,
-             contracts_exited, realized_pnl, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (pos_id, exit_date.strftime("%Y-%m-%d"), exit_price, exit_reason, qty_pct,
-              shares_exit, contracts_exit, pnl, now))
+    cursor = cursor or conn.cursor()
+    cursor.executemany(_SQL_INSERT_POSITION_EXITS, [
+        (pos_id, exit_date.isoformat(), *rest)
+        for pos_id, exit_date, *rest in exits_data
+    ])
 
-    conn.commit()
+    if commit:
+        conn.commit()
     return len(exits_data)
 
 
-def seed_comments(conn, run_ids, post_ids):
+def seed_comments(conn, run_ids, post_ids, commit=True, cursor=None):
     """Create 10+ comments with AI annotation fields."""
     if not run_ids or not post_ids:
         print("WARNING: No analysis runs or posts found.")
@@ -301,88 +407,75 @@ def seed_comments(conn, run_ids, post_ids):
 
     # Use first completed run
     run_id = run_ids[0]
-    today = datetime.now()
+    today = _NOW
 
     comments_data = [
         (run_id, post_ids[0], "com001nvda", "DeepValueHunter",
          "NVDA calls are the move. $500c 2/14 looking juicy. Data center demand is insane.",
-         (today - timedelta(days=2, hours=2)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(days=2, hours=2)).isoformat(sep=" ", timespec="seconds"),
          145, None, 0, 0.85, "bullish", False, True,
          "Strong conviction based on data center demand fundamentals", 0.82, 0.82),
 
         (run_id, post_ids[0], "com002nvda", "OptionsYOLO",
          "I'm all in on NVDA. This is going to 600 by end of month. 🚀🚀🚀",
-         (today - timedelta(days=2, hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(days=2, hours=1)).isoformat(sep=" ", timespec="seconds"),
          89, None, 0, 0.78, "bullish", False, False, None, 0.72, 0.75),
 
         (run_id, post_ids[1], "com003gme", "DiamondHandsDan",
          "GME volume is crazy. Someone knows something. Loading up on shares.",
-         (today - timedelta(days=1, hours=12)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(days=1, hours=12)).isoformat(sep=" ", timespec="seconds"),
          210, None, 0, 0.92, "bullish", False, True,
          "Unusual volume spike suggests institutional accumulation", 0.88, 0.70),
 
         (run_id, post_ids[1], "com004gme", "MemeStonkKing",
          "GME to the moon! Buy buy buy! Diamond hands! 💎🙌",
-         (today - timedelta(days=1, hours=11)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(days=1, hours=11)).isoformat(sep=" ", timespec="seconds"),
          95, None, 0, 0.65, "bullish", False, False, None, 0.55, 0.65),
 
         (run_id, post_ids[2], "com005tsla", "TechStockBull",
          "TSLA $250 calls expiring Friday. Elon's tweet will save us, right? Right??",
-         (today - timedelta(hours=8)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(hours=8)).isoformat(sep=" ", timespec="seconds"),
          45, None, 0, 0.42, "bullish", True, False, None, 0.35, 0.88),
 
         (run_id, post_ids[2], "com006tsla", "QuietAnalyst",
          "TSLA fundamentals support a move to $280. Q4 deliveries exceeded expectations.",
-         (today - timedelta(hours=7)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(hours=7)).isoformat(sep=" ", timespec="seconds"),
          120, None, 0, 0.88, "bullish", False, True,
          "Q4 delivery numbers and margin expansion provide upside catalyst", 0.85, 0.92),
 
         (run_id, post_ids[3], "com007amd", "DeepValueHunter",
          "AMD taking Intel's lunch money. Market share gains across data center and consumer. $180 PT.",
-         (today - timedelta(hours=6)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(hours=6)).isoformat(sep=" ", timespec="seconds"),
          165, None, 0, 0.90, "bullish", False, True,
          "Market share gains in data center and consumer segments support upside", 0.88, 0.82),
 
         (run_id, post_ids[3], "com008amd", "TechStockBull",
          "AMD chips in every new AI server. This is just getting started.",
-         (today - timedelta(hours=5)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(hours=5)).isoformat(sep=" ", timespec="seconds"),
          78, None, 0, 0.82, "bullish", False, True,
          "AI server adoption accelerating, AMD positioned to benefit", 0.80, 0.88),
 
         (run_id, post_ids[4], "com009aapl", "OptionsYOLO",
          "AAPL $195c printing tomorrow. Vision Pro launch is priced in? Nah.",
-         (today - timedelta(hours=4)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(hours=4)).isoformat(sep=" ", timespec="seconds"),
          52, None, 0, 0.68, "bullish", False, False, None, 0.65, 0.75),
 
         (run_id, post_ids[4], "com010sofi", "QuietAnalyst",
          "SOFI has real potential here. Banking charter + student loan restart = revenue growth.",
-         (today - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M:%S"),
+         (today - timedelta(hours=3)).isoformat(sep=" ", timespec="seconds"),
          92, None, 0, 0.78, "bullish", False, True,
          "Banking charter and student loan restart provide fundamental catalysts", 0.75, 0.92),
     ]
 
-    cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cursor = cursor or conn.cursor()
+    comment_ids = _insert_returning(cursor, _SQL_INSERT_COMMENTS, comments_data)
 
-    for comment_data in comments_data:
-        (run_id, post_id, reddit_id, author, body, created, score, parent_id, depth,
-         prior_score, sentiment, sarcasm, has_reasoning, reasoning, ai_conf, trust_score) = comment_data
+    if commit:
+        conn.commit()
+    return comment_ids
 
-        cursor.execute("""
-            INSERT OR IGNORE INTO comments
-            (analysis_run_id, post_id, reddit_id, author, body, created_utc, score,
-             parent_comment_id, depth, prioritization_score, sentiment, sarcasm_detected,
-             has_reasoning, reasoning_summary, ai_confidence, author_trust_score, analyzed_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (run_id, post_id, reddit_id, author, body, created, score, parent_id, depth,
-              prior_score, sentiment, sarcasm, has_reasoning, reasoning, ai_conf, trust_score, now))
 
-    conn.commit()
-    cursor.execute("SELECT id, reddit_id FROM comments ORDER BY id")
-    return cursor.fetchall()
-
-
-def seed_signal_comments(conn, signal_ids, comment_ids):
+def seed_signal_comments(conn, signal_ids, comment_ids, commit=True, cursor=None):
     """Create signal_comments junction records."""
     if not signal_ids or not comment_ids:
         return 0
@@ -401,30 +494,27 @@ def seed_signal_comments(conn, signal_ids, comment_ids):
         "com010sofi": "SOFI",
     }
 
-    cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    count = 0
+    cursor = cursor or conn.cursor()
 
-    for comment_id, reddit_id in comment_ids:
-        ticker = comment_ticker_map.get(reddit_id)
-        if not ticker:
-            continue
+    # Index signals by ticker once (both quality and consensus signals)
+    signals_by_ticker = {}
+    for signal_id, sig_ticker, sig_type in signal_ids:
+        signals_by_ticker.setdefault(sig_ticker, []).append(signal_id)
+
+    rows = [
+        (signal_id, comment_id)
+        for comment_id, reddit_id in comment_ids
+        for signal_id in signals_by_ticker.get(comment_ticker_map.get(reddit_id), ())
+    ]
 
-        # Find matching signals for this ticker (both quality and consensus)
-        for signal_id, sig_ticker, sig_type in signal_ids:
-            if sig_ticker == ticker:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO signal_comments
-                    (signal_id, comment_id, created_at)
-                    VALUES (?, ?, ?)
-                """, (signal_id, comment_id, now))
-                count += 1
+    _insert_values(cursor, _SQL_INSERT_SIGNAL_COMMENTS, _SQL_SIGNAL_COMMENTS_ROW, rows)
 
-    conn.commit()
-    return count
+    if commit:
+        conn.commit()
+    return len(rows)
 
 
-def seed_comment_tickers(conn, comment_ids):
+def seed_comment_tickers(conn, comment_ids, commit=True, cursor=None):
     """Create comment_tickers junction records."""
     if not comment_ids:
         return 0
@@ -442,37 +532,31 @@ def seed_comment_tickers(conn, comment_ids):
         "com010sofi": [("SOFI", "bullish")],
     }
 
-    cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    count = 0
-
-    for comment_id, reddit_id in comment_ids:
-        tickers_data = comment_ticker_map.get(reddit_id, [])
-        for ticker, sentiment in tickers_data:
-            cursor.execute("""
-                INSERT OR IGNORE INTO comment_tickers
-                (comment_id, ticker, sentiment, created_at)
-                VALUES (?, ?, ?, ?)
-            """, (comment_id, ticker, sentiment, now))
-            count += 1
+    cursor = cursor or conn.cursor()
+    rows = [
+        (comment_id, ticker, sentiment)
+        for comment_id, reddit_id in comment_ids
+        for ticker, sentiment in comment_ticker_map.get(reddit_id, [])
+    ]
+    _insert_values(cursor, _SQL_INSERT_COMMENT_TICKERS, _SQL_COMMENT_TICKERS_ROW, rows)
 
-    conn.commit()
-    return count
+    if commit:
+        conn.commit()
+    return len(rows)
 
 
-def seed_evaluation_periods(conn):
+def seed_evaluation_periods(conn, commit=True, cursor=None):
     """Create 1 evaluation period per portfolio (mix of active/completed)."""
-    cursor = conn.cursor()
+    cursor = cursor or conn.cursor()
     cursor.execute("SELECT id, instrument_type, signal_type FROM portfolios ORDER BY id")
     portfolios = cursor.fetchall()
 
     if not portfolios:
         return 0
 
-    today = date.today()
+    today = _TODAY
     period_start = today - timedelta(days=15)
     period_end = today + timedelta(days=15)
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     periods_data = [
         # Stocks Quality - active
@@ -490,28 +574,17 @@ def seed_evaluation_periods(conn):
          5, 3, 2, 1.25, 60.0, 100000.0),
     ]
 
-    count = 0
-    for period_data in periods_data:
-        (port_id, start, end, inst_type, sig_type, status, port_ret, sp_ret, rel_perf,
-         beat_bench, total_pos, win_pos, lose_pos, avg_ret, accuracy, val_start) = period_data
+    cursor.executemany(_SQL_INSERT_EVALUATION_PERIODS, [
+        (port_id, start.isoformat(), end.isoformat(), *rest)
+        for port_id, start, end, *rest in periods_data
+    ])
 
-        cursor.execute("""
-            INSERT OR IGNORE INTO evaluation_periods
-            (portfolio_id, period_start, period_end, instrument_type, signal_type, status,
-             portfolio_return_pct, sp500_return_pct, relative_performance, beat_benchmark,
-             total_positions_closed, winning_positions, losing_positions, avg_return_pct,
-             signal_accuracy_pct, value_at_period_start, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (port_id, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), inst_type, sig_type,
-              status, port_ret, sp_ret, rel_perf, beat_bench, total_pos, win_pos, lose_pos,
-              avg_ret, accuracy, val_start, now))
-        count += 1
+    if commit:
+        conn.commit()
+    return len(periods_data)
 
-    conn.commit()
-    return count
 
-
-def seed_price_history(conn):
+def seed_price_history(conn, commit=True, cursor=None):
     """Create 14+ days of price history per ticker for sparklines."""
     tickers_data = {
         "AAPL": 188.20,
@@ -524,32 +597,47 @@ def seed_price_history(conn):
         "AMC": 8.60,
     }
 
-    cursor = conn.cursor()
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    count = 0
+    cursor = cursor or conn.cursor()
+    rows = []
+
+    # 15 days of history (14 days ago to today), same dates for every ticker
+    price_dates = [(i, (_TODAY - timedelta(days=i)).isoformat()) for i in range(14, -1, -1)]
+
+    # Fixed seed so the sparklines are the same on every fresh database
+    uniform = random.Random(PRICE_HISTORY_SEED).uniform
+    append = rows.append
 
     for ticker, base_price in tickers_data.items():
-        for i in range(14, -1, -1):  # 15 days of history (14 days ago to today)
-            price_date = date.today() - timedelta(days=i)
+        for i, price_date in price_dates:
 
             # Generate realistic daily variation
-            daily_var = random.uniform(-0.03, 0.03)  # +/- 3% daily
+            daily_var = uniform(-0.03, 0.03)  # +/- 3% daily
             close_price = base_price * (1 + daily_var * (14 - i) / 14)  # Trend toward base_price
-            open_price = close_price * (1 + random.uniform(-0.01, 0.01))
-            high_price = max(open_price, close_price) * (1 + random.uniform(0, 0.02))
-            low_price = min(open_price, close_price) * (1 - random.uniform(0, 0.02))
+            open_price = close_price * (1 + uniform(-0.01, 0.01))
+            high_price = max(open_price, close_price) * (1 + uniform(0, 0.02))
+            low_price = min(open_price, close_price) * (1 - uniform(0, 0.02))
+
+            append((ticker, price_date,
+                    round(open_price, 2), round(high_price, 2),
+                    round(low_price, 2), round(close_price, 2)))
+
+    cursor.executemany(_SQL_INSERT_PRICE_HISTORY, rows)
+
+    if commit:
+        conn.commit()
+    return len(rows)
 
-            cursor.execute("""
-                INSERT OR IGNORE INTO price_history
-                (ticker, date, open, high, low, close, fetched_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (ticker, price_date.strftime("%Y-%m-%d"),
-                  round(open_price, 2), round(high_price, 2),
-                  round(low_price, 2), round(close_price, 2), now))
-            count += 1
 
-    conn.commit()
-    return count
+def is_seeded(conn):
+    """Check whether a previous run already seeded this database.
+
+    main() seeds every table in one transaction, so one seed row being
+    present means all of them are.
+    """
+    cursor = conn.execute(
+        "SELECT EXISTS(SELECT 1 FROM comments WHERE reddit_id = ?)", (_SEED_SENTINEL_COMMENT,)
+    )
+    return bool(cursor.fetchone()[0])
 
 
 def main():
@@ -566,51 +654,70 @@ def main():
     try:
         conn = connect_db(db_path)
 
-        # Seed all tables
-        print("Seeding authors...", end=" ")
-        author_count = seed_authors(conn)
-        print(f"{author_count} authors created")
-
-        print("Seeding analysis runs...", end=" ")
-        run_ids = seed_analysis_runs(conn)
-        print(f"{len(run_ids)} runs created")
-
-        print("Seeding reddit posts...", end=" ")
-        post_ids = seed_reddit_posts(conn)
-        print(f"{len(post_ids)} posts created")
-
-        print("Seeding signals...", end=" ")
-        signal_ids = seed_signals(conn)
-        print(f"{len(signal_ids)} signals created")
-
-        print("Seeding positions...", end=" ")
-        closed_positions = seed_positions(conn, signal_ids)
-        print(f"{closed_positions} positions created")
-
-        print("Seeding position exits...", end=" ")
-        exit_count = seed_position_exits(conn, closed_positions)
-        print(f"{exit_count} exits created")
-
-        print("Seeding comments...", end=" ")
-        comment_ids = seed_comments(conn, run_ids, post_ids)
-        print(f"{len(comment_ids)} comments created")
-
-        print("Seeding signal_comments junctions...", end=" ")
-        sig_com_count = seed_signal_comments(conn, signal_ids, comment_ids)
-        print(f"{sig_com_count} links created")
-
-        print("Seeding comment_tickers junctions...", end=" ")
-        com_tick_count = seed_comment_tickers(conn, comment_ids)
-        print(f"{com_tick_count} links created")
-
-        print("Seeding evaluation periods...", end=" ")
-        eval_count = seed_evaluation_periods(conn)
-        print(f"{eval_count} periods created")
-
-        print("Seeding price history...", end=" ")
-        price_count = seed_price_history(conn)
-        print(f"{price_count} price records created")
-
+        if is_seeded(conn):
+            conn.close()
+            print("Seed data already present, nothing to do.")
+            return 0
+
+        # Seed all tables in one transaction: committed once at the end, or
+        # rolled back entirely on error. Every stage shares one cursor.
+        # Stages insert parents before children, so per-row foreign key
+        # checks are off and one foreign_key_check runs before the commit
+        # (the pragma can't change inside a transaction).
+        cursor = conn.cursor()
+        conn.execute("PRAGMA foreign_keys = OFF")
+        with conn:
+            print("Seeding authors...", end=" ")
+            author_count = seed_authors(conn, commit=False, cursor=cursor)
+            print(f"{author_count} authors created")
+
+            print("Seeding analysis runs...", end=" ")
+            run_ids = seed_analysis_runs(conn, commit=False, cursor=cursor)
+            print(f"{len(run_ids)} runs created")
+
+            print("Seeding reddit posts...", end=" ")
+            post_ids = seed_reddit_posts(conn, commit=False, cursor=cursor)
+            print(f"{len(post_ids)} posts created")
+
+            print("Seeding signals...", end=" ")
+            signal_ids = seed_signals(conn, commit=False, cursor=cursor)
+            print(f"{len(signal_ids)} signals created")
+
+            print("Seeding positions...", end=" ")
+            closed_positions = seed_positions(conn, signal_ids, commit=False, cursor=cursor)
+            print(f"{closed_positions} positions created")
+
+            print("Seeding position exits...", end=" ")
+            exit_count = seed_position_exits(conn, closed_positions, commit=False, cursor=cursor)
+            print(f"{exit_count} exits created")
+
+            print("Seeding comments...", end=" ")
+            comment_ids = seed_comments(conn, run_ids, post_ids, commit=False, cursor=cursor)
+            print(f"{len(comment_ids)} comments created")
+
+            print("Seeding signal_comments junctions...", end=" ")
+            sig_com_count = seed_signal_comments(conn, signal_ids, comment_ids, commit=False, cursor=cursor)
+            print(f"{sig_com_count} links created")
+
+            print("Seeding comment_tickers junctions...", end=" ")
+            com_tick_count = seed_comment_tickers(conn, comment_ids, commit=False, cursor=cursor)
+            print(f"{com_tick_count} links created")
+
+            print("Seeding evaluation periods...", end=" ")
+            eval_count = seed_evaluation_periods(conn, commit=False, cursor=cursor)
+            print(f"{eval_count} periods created")
+
+            print("Seeding price history...", end=" ")
+            price_count = seed_price_history(conn, commit=False, cursor=cursor)
+            print(f"{price_count} price records created")
+
+            violations = cursor.execute("PRAGMA foreign_key_check").fetchall()
+            if violations:
+                raise sqlite3.IntegrityError(
+                    f"{len(violations)} foreign key violations, first in {violations[0][0]}"
+                )
+
+        conn.execute("PRAGMA foreign_keys = ON")
         conn.close()
 
         print("-" * 60)
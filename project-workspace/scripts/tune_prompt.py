@@ -10,46 +10,52 @@ Usage:
     python scripts/tune_prompt.py o50n9bi --temperature 0.7 --no-market-context
     python scripts/tune_prompt.py o50n9bi --runs 5
     python scripts/tune_prompt.py o50n9bi --compare "temp=0.3" "temp=0.7,no-market-context"
+    python scripts/tune_prompt.py --ids-file ids.txt --runs 3
     python scripts/tune_prompt.py --list-flips --db data/wsb_pre_update.db --db2 data/wsb.db
 
 Requires env var: OPENAI_API_KEY (not needed for --dry-run or --list-flips)
 """
 
 import argparse
+import asyncio
+import atexit
+import hashlib
 import json
+import math
 import os
 import sqlite3
-import statistics
 import sys
-from collections import Counter
+import threading
+import time
+from contextlib import nullcontext
 from datetime import datetime, timezone
+from functools import lru_cache
 
 # Add project root to path for src imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.env import load_dotenv_once
 
-def _load_dotenv():
-    """Load .env file into os.environ if it exists."""
-    env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env")
-    if os.path.exists(env_path):
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, value = line.partition("=")
-                    os.environ.setdefault(key.strip(), value.strip())
+load_dotenv_once()
 
-_load_dotenv()
-
-from src.prompts import SYSTEM_PROMPT, build_user_prompt
-from src.ai_parser import parse_ai_response, normalize_tickers
-from src.market_context import fetch_market_context, should_include_context, format_market_context
+# Other src modules are imported inside the functions that use them: market_context
+# pulls in yfinance/pandas, which --dry-run and --list-flips never need
 
 
 # Defaults
 DEFAULT_MODEL = "gpt-4o-mini"
 DEFAULT_TEMPERATURE = 0.3
 DEFAULT_MAX_TOKENS = 500
+# "json_object" matches the production pipeline; "json_schema" uses OpenAI
+# structured outputs constrained to AI_RESPONSE_SCHEMA
+DEFAULT_RESPONSE_FORMAT = "json_object"
+RESPONSE_FORMATS = ("json_object", "json_schema")
+
+# Upper bound on API calls in flight for --runs and --compare
+MAX_CONCURRENT_CALLS = 5
+
+# --compare config labels: A, B, C...
+LABELS = [chr(65 + i) for i in range(26)]
 
 # GPT-4o-mini pricing (per 1M tokens)
 COST_PER_1M_INPUT = 0.15
@@ -57,13 +63,113 @@ COST_PER_1M_OUTPUT = 0.60
 
 
 DEFAULT_LOG_PATH = "data/tuning-results.jsonl"
+DEFAULT_FLIPS_LIMIT = 500
+DEFAULT_CACHE_PATH = "data/tuning-cache.db"
+# Cached results are stored already parsed; bump this when
+# parse_ai_response/normalize_tickers output changes to invalidate them
+CACHE_VERSION = 1
+
+# Live market context is reused for this long (seconds) within one process,
+# e.g. across the comments of an --ids-file run
+MARKET_CONTEXT_TTL = 900
+_MARKET_CACHE = {"fetched_at": None, "context": None}
+
+# Shared OpenAI clients, created on first API call (--dry-run never builds them).
+# The async client serves --runs/--compare and is bound to _LOOP, the one event
+# loop those commands run on, so it is reused across --ids-file comments.
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+_ASYNC_CLIENT = None
+_LOOP = None
+
+
+def open_log(args):
+    """Open the results log for buffered appends (a null context with --no-log).
+
+    Commands open it once and write every run's entry through the same
+    handle; entries reach the file when it is closed.
+    """
+    if args.no_log:
+        return nullcontext()
+    log_dir = os.path.dirname(args.log)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    return open(args.log, "ab", buffering=1 << 16)
+
+
+def append_log(log_file, entry):
+    """Append a JSON line to the open log file."""
+    from src.json_io import dumps_line
+
+    log_file.write(dumps_line(entry))
+
+
+def response_cache_key(model, temperature, max_tokens, response_format, system_prompt, user_prompt):
+    """Hash everything that determines an API response into a cache key."""
+    payload = json.dumps([model, temperature, max_tokens, response_format, system_prompt, user_prompt])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _open_cache(cache_path):
+    """Open the response cache database, creating it on first use."""
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    conn = sqlite3.connect(cache_path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS analyses (
+            key TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            parsed TEXT NOT NULL,
+            usage TEXT NOT NULL,
+            ts INTEGER NOT NULL
+        )
+    """)
+    return conn
 
 
-def append_log(log_path, entry):
-    """Append a JSON line to the log file."""
-    os.makedirs(os.path.dirname(log_path), exist_ok=True)
-    with open(log_path, "a") as f:
-        f.write(json.dumps(entry, default=str) + "\n")
+def cache_get(cache_path, key):
+    """Return the cached (parsed, usage) for a key, or None on a miss."""
+    conn = _open_cache(cache_path)
+    try:
+        row = conn.execute(
+            "SELECT parsed, usage FROM analyses WHERE key = ? AND version = ?",
+            (key, CACHE_VERSION),
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return json.loads(row[0]), json.loads(row[1])
+
+
+def cache_put(cache_path, key, parsed, usage):
+    """Store a parsed analysis result in the cache."""
+    conn = _open_cache(cache_path)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, version, parsed, usage, ts) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, CACHE_VERSION, json.dumps(parsed), json.dumps(usage),
+                 int(datetime.now(timezone.utc).timestamp())),
+            )
+    finally:
+        conn.close()
+
+
+def resolve_cache_path(args, config):
+    """Return the response cache path to use for a config, or None to bypass it.
+
+    Responses sampled at temperature > 0 are expected to vary, so they are
+    only cached with --cache-stochastic.
+    """
+    if args.no_cache:
+        return None
+    if config['temperature'] > 0 and not args.cache_stochastic:
+        return None
+    return args.cache
 
 
 def build_log_entry(reddit_id, config, parsed, usage, mode, label=None, tag=None):
@@ -77,6 +183,7 @@ def build_log_entry(reddit_id, config, parsed, usage, mode, label=None, tag=None
             "max_tokens": config["max_tokens"],
             "market_context": config["market_context"],
             "system_prompt_file": config.get("system_prompt_file"),
+            "response_format": config.get("response_format", DEFAULT_RESPONSE_FORMAT),
         },
         "result": {
             "sentiment": parsed["sentiment"],
@@ -93,28 +200,49 @@ def build_log_entry(reddit_id, config, parsed, usage, mode, label=None, tag=None
     }
 
 
-def load_comment(db_path, reddit_id):
-    """Load a comment with its post context from the database."""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+@lru_cache(maxsize=8)
+def _read_conn(db_path):
+    """Open a read-only connection to db_path, reused for the rest of the process."""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA query_only = 1")
+    atexit.register(conn.close)
+    return conn
 
-    row = conn.execute("""
+
+def load_comments(db_path, reddit_ids):
+    """Load comments with their post context in one query, keyed by reddit_id.
+
+    Ids that are not in the database are absent from the result.
+    """
+    placeholders = ",".join("?" * len(reddit_ids))
+    cursor = _read_conn(db_path).execute(f"""
         SELECT c.reddit_id, c.body, c.author, c.author_trust_score,
                c.parent_chain, c.sentiment, c.ai_confidence,
                c.sarcasm_detected, c.has_reasoning, c.reasoning_summary,
                p.title AS post_title, p.image_analysis
         FROM comments c
         JOIN reddit_posts p ON c.post_id = p.id
-        WHERE c.reddit_id = ?
-    """, (reddit_id,)).fetchone()
+        WHERE c.reddit_id IN ({placeholders})
+    """, list(reddit_ids))
+    columns = [col[0] for col in cursor.description]
+    return {row[0]: dict(zip(columns, row)) for row in cursor}
 
-    conn.close()
 
-    if row is None:
+def load_comment(db_path, reddit_id):
+    """Load a comment with its post context from the database."""
+    comment = load_comments(db_path, [reddit_id]).get(reddit_id)
+
+    if comment is None:
         print(f"Error: Comment '{reddit_id}' not found in {db_path}")
         sys.exit(1)
 
-    return dict(row)
+    return comment
+
+
+def read_ids_file(path):
+    """Read newline-separated reddit ids, skipping blank lines and # comments."""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
 
 
 def get_market_context_string(args):
@@ -124,70 +252,195 @@ def get_market_context_string(args):
     if args.market_context:
         return args.market_context
 
-    # Fetch live market context with gate check
+    from src.market_context import fetch_market_context, should_include_context, format_market_context
+
+    fetched_at = _MARKET_CACHE["fetched_at"]
+    if (not args.no_market_cache and fetched_at is not None
+            and time.monotonic() - fetched_at < MARKET_CONTEXT_TTL):
+        return _MARKET_CACHE["context"]
+
+    # Fetch live market context with gate check; failures are not cached
     try:
         data = fetch_market_context()
+        context = None
         if data and should_include_context(data):
-            return format_market_context(data)
+            context = format_market_context(data)
     except Exception:
-        pass
-    return None
+        return None
+    _MARKET_CACHE["fetched_at"] = time.monotonic()
+    _MARKET_CACHE["context"] = context
+    return context
+
+
+@lru_cache(maxsize=128)
+def _render_user_prompt(post_title, image_description, parent_chain_formatted,
+                        author, author_trust, comment_body, market_context):
+    """Render the user prompt once per distinct input (all args are strings/floats).
+
+    --compare configs, --runs repeats and the concurrent workers for them
+    all render the same comment; only a new market context re-renders it.
+    """
+    from src.prompts import build_user_prompt
+
+    return build_user_prompt(
+        post_title=post_title,
+        image_description=image_description,
+        parent_chain_formatted=parent_chain_formatted,
+        author=author,
+        author_trust=author_trust,
+        comment_body=comment_body,
+        market_context=market_context,
+    )
 
 
 def build_prompts(comment, market_context_str, system_prompt_override=None):
     """Build the system and user prompts for a comment."""
+    from src.prompts import SYSTEM_PROMPT
+
     sys_prompt = system_prompt_override or SYSTEM_PROMPT
-    user_prompt = build_user_prompt(
-        post_title=comment['post_title'],
-        image_description=comment['image_analysis'],
-        parent_chain_formatted=comment['parent_chain'] or '',
-        author=comment['author'],
-        author_trust=comment['author_trust_score'] or 0.5,
-        comment_body=comment['body'],
-        market_context=market_context_str,
+    user_prompt = _render_user_prompt(
+        comment['post_title'],
+        comment['image_analysis'],
+        comment['parent_chain'] or '',
+        comment['author'],
+        comment['author_trust_score'] or 0.5,
+        comment['body'],
+        market_context_str,
     )
     return sys_prompt, user_prompt
 
 
-def call_openai(system_prompt, user_prompt, model, temperature, max_tokens):
-    """Make a direct OpenAI API call with configurable parameters."""
-    import openai
+def get_openai_client(api_key):
+    """Return the process-wide OpenAI client so calls reuse pooled connections."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            import httpx
+            import openai
+
+            limits = httpx.Limits(max_connections=MAX_CONCURRENT_CALLS,
+                                  max_keepalive_connections=MAX_CONCURRENT_CALLS)
+            _CLIENT = openai.OpenAI(api_key=api_key,
+                                    http_client=openai.DefaultHttpxClient(limits=limits))
+        return _CLIENT
+
+
+def get_async_openai_client(api_key):
+    """Return the process-wide AsyncOpenAI client (pooled like get_openai_client)."""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        import httpx
+        import openai
+
+        limits = httpx.Limits(max_connections=MAX_CONCURRENT_CALLS,
+                              max_keepalive_connections=MAX_CONCURRENT_CALLS)
+        _ASYNC_CLIENT = openai.AsyncOpenAI(api_key=api_key,
+                                           http_client=openai.DefaultAsyncHttpxClient(limits=limits))
+    return _ASYNC_CLIENT
+
+
+def run_async(coro):
+    """Run coro to completion on the process-wide event loop."""
+    global _LOOP
+    if _LOOP is None:
+        _LOOP = asyncio.new_event_loop()
+        atexit.register(_LOOP.close)
+    return _LOOP.run_until_complete(coro)
+
+
+def _completion_params(system_prompt, user_prompt, model, temperature, max_tokens,
+                       response_format):
+    """Build the chat.completions.create keyword arguments for one request."""
+    from src.ai_parser import AI_RESPONSE_SCHEMA
+
+    if response_format == "json_schema":
+        # Structured outputs: the model can only emit schema-valid JSON
+        format_param = {
+            "type": "json_schema",
+            "json_schema": {"name": "wsb_analysis", "schema": AI_RESPONSE_SCHEMA, "strict": True},
+        }
+    else:
+        format_param = {"type": response_format}
+
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "response_format": format_param,
+    }
 
+
+def _require_api_key():
+    """Return OPENAI_API_KEY, exiting if it isn't set."""
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         print("Error: OPENAI_API_KEY not set")
         sys.exit(1)
+    return api_key
 
-    client = openai.OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        temperature=temperature,
-        max_tokens=max_tokens,
-        response_format={"type": "json_object"},
-    )
 
+def _response_content(response):
+    """Split a chat completion into (content, usage)."""
     content = response.choices[0].message.content
+    # Prompt tokens served from OpenAI's prefix cache (the static system
+    # prompt leads every request, so repeated calls should hit it)
+    details = getattr(response.usage, "prompt_tokens_details", None)
     usage = {
         "prompt_tokens": response.usage.prompt_tokens,
         "completion_tokens": response.usage.completion_tokens,
+        "cached_tokens": getattr(details, "cached_tokens", None) or 0,
     }
     return content, usage
 
 
-def run_analysis(comment, config):
-    """Run a single analysis with the given config. Returns parsed result + usage."""
+def call_openai(system_prompt, user_prompt, model, temperature, max_tokens,
+                response_format=DEFAULT_RESPONSE_FORMAT):
+    """Make a direct OpenAI API call with configurable parameters."""
+    params = _completion_params(system_prompt, user_prompt, model, temperature,
+                                max_tokens, response_format)
+    client = get_openai_client(_require_api_key())
+    return _response_content(client.chat.completions.create(**params))
+
+
+async def call_openai_async(system_prompt, user_prompt, model, temperature, max_tokens,
+                            response_format=DEFAULT_RESPONSE_FORMAT):
+    """call_openai on the shared AsyncOpenAI client."""
+    params = _completion_params(system_prompt, user_prompt, model, temperature,
+                                max_tokens, response_format)
+    client = get_async_openai_client(_require_api_key())
+    return _response_content(await client.chat.completions.create(**params))
+
+
+def _prepare_analysis(comment, config, cache_path):
+    """Build the prompts and look up the cache for one analysis.
+
+    Returns (call_args, key, cached): call_args for call_openai, the cache
+    key (None without a cache_path), and the cached (parsed, usage) or None.
+    """
     sys_prompt, user_prompt = build_prompts(
         comment, config['market_context'], config.get('system_prompt')
     )
+    call_args = (sys_prompt, user_prompt, config['model'], config['temperature'],
+                 config['max_tokens'], config.get('response_format', DEFAULT_RESPONSE_FORMAT))
 
-    raw_content, usage = call_openai(
-        sys_prompt, user_prompt,
-        config['model'], config['temperature'], config['max_tokens']
-    )
+    if not cache_path:
+        return call_args, None, None
+    key = response_cache_key(config['model'], config['temperature'], config['max_tokens'],
+                             call_args[5], sys_prompt, user_prompt)
+    cached = cache_get(cache_path, key)
+    if cached:
+        parsed, usage = cached
+        cached = parsed, {**usage, "cache_hit": True}
+    return call_args, key, cached
+
+
+def _finish_analysis(raw_content, usage, cache_path, key):
+    """Parse and normalize an API response, storing it in the cache."""
+    from src.ai_parser import parse_ai_response, normalize_tickers
 
     parsed = parse_ai_response(raw_content)
     tickers, ticker_sentiments = normalize_tickers(
@@ -195,10 +448,49 @@ def run_analysis(comment, config):
     )
     parsed['tickers'] = tickers
     parsed['ticker_sentiments'] = ticker_sentiments
+    # Display form, built once for the result/run/compare formatters
+    parsed['_tickers_str'] = ", ".join(
+        f"{t}({s})" for t, s in zip(tickers, ticker_sentiments)
+    ) or "none"
 
+    if cache_path:
+        cache_put(cache_path, key, parsed, usage)
     return parsed, usage
 
 
+def run_analysis(comment, config, cache_path=None):
+    """Run a single analysis with the given config. Returns parsed result + usage.
+
+    With a cache_path, a request identical to an earlier one returns the
+    stored parsed result without calling the API or re-parsing; cache hits
+    are marked with usage["cache_hit"].
+    """
+    call_args, key, cached = _prepare_analysis(comment, config, cache_path)
+    if cached:
+        return cached
+    raw_content, usage = call_openai(*call_args)
+    return _finish_analysis(raw_content, usage, cache_path, key)
+
+
+async def run_analysis_async(comment, config, cache_path=None, semaphore=None):
+    """run_analysis with the API call awaited, at most semaphore-many at once."""
+    call_args, key, cached = _prepare_analysis(comment, config, cache_path)
+    if cached:
+        return cached
+    async with semaphore or nullcontext():
+        raw_content, usage = await call_openai_async(*call_args)
+    return _finish_analysis(raw_content, usage, cache_path, key)
+
+
+async def gather_analyses(comment, configs, cache_paths):
+    """Run one analysis per config concurrently; results keep config order."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+    return await asyncio.gather(*(
+        run_analysis_async(comment, config, cache_path, semaphore)
+        for config, cache_path in zip(configs, cache_paths)
+    ))
+
+
 def format_comment_header(comment):
     """Format the comment info block."""
     trust = comment['author_trust_score'] or 0.5
@@ -227,7 +519,8 @@ def format_config(config):
     """Format the config block."""
     lines = [
         "=== CONFIG ===",
-        f"Model: {config['model']} | Temp: {config['temperature']} | Max Tokens: {config['max_tokens']}",
+        f"Model: {config['model']} | Temp: {config['temperature']} | Max Tokens: {config['max_tokens']} "
+        f"| Format: {config.get('response_format', DEFAULT_RESPONSE_FORMAT)}",
     ]
     if config['market_context']:
         # Show first line of market context
@@ -240,17 +533,13 @@ def format_config(config):
 
 def format_result(parsed, usage):
     """Format a single analysis result."""
-    tickers_str = ", ".join(
-        f"{t}({s})" for t, s in zip(parsed['tickers'], parsed['ticker_sentiments'])
-    ) or "none"
-
     cost = (usage['prompt_tokens'] * COST_PER_1M_INPUT +
             usage['completion_tokens'] * COST_PER_1M_OUTPUT) / 1_000_000
 
     lines = [
         "=== RESULT ===",
         f"Sentiment: {parsed['sentiment']} (confidence: {parsed['confidence']})",
-        f"Tickers: {tickers_str}",
+        f"Tickers: {parsed['_tickers_str']}",
         f"Sarcasm: {'yes' if parsed['sarcasm_detected'] else 'no'} "
         f"| Reasoning: {'yes' if parsed['has_reasoning'] else 'no'}",
     ]
@@ -259,8 +548,9 @@ def format_result(parsed, usage):
         if len(summary) > 120:
             summary = summary[:120] + "..."
         lines.append(f"Summary: \"{summary}\"")
-    lines.append(f"Tokens: {usage['prompt_tokens']} prompt / "
-                 f"{usage['completion_tokens']} completion (${cost:.4f})")
+    cached = " [cache hit]" if usage.get('cache_hit') else ""
+    lines.append(f"Tokens: {usage['prompt_tokens']} prompt ({usage.get('cached_tokens', 0)} cached) / "
+                 f"{usage['completion_tokens']} completion (${cost:.4f}){cached}")
     return "\n".join(lines)
 
 
@@ -272,6 +562,7 @@ def parse_config_string(config_str, base_market_context):
         'max_tokens': DEFAULT_MAX_TOKENS,
         'market_context': base_market_context,
         'system_prompt': None,
+        'response_format': DEFAULT_RESPONSE_FORMAT,
     }
 
     for part in config_str.split(','):
@@ -288,6 +579,10 @@ def parse_config_string(config_str, base_market_context):
                 config['max_tokens'] = int(value)
             elif key == 'model':
                 config['model'] = value
+            elif key == 'response-format':
+                if value not in RESPONSE_FORMATS:
+                    raise ValueError(f"response-format must be one of {RESPONSE_FORMATS}, got {value!r}")
+                config['response_format'] = value
             elif key == 'system-prompt':
                 with open(value) as f:
                     config['system_prompt'] = f.read()
@@ -297,9 +592,8 @@ def parse_config_string(config_str, base_market_context):
     return config
 
 
-def cmd_single(args):
+def cmd_single(args, comment):
     """Run a single analysis and display results."""
-    comment = load_comment(args.db, args.reddit_id)
     market_ctx = get_market_context_string(args)
 
     config = {
@@ -308,6 +602,7 @@ def cmd_single(args):
         'max_tokens': args.max_tokens,
         'market_context': market_ctx,
         'system_prompt': None,
+        'response_format': args.response_format,
     }
     if args.system_prompt:
         with open(args.system_prompt) as f:
@@ -330,18 +625,20 @@ def cmd_single(args):
         print(user_prompt)
         return
 
-    parsed, usage = run_analysis(comment, config)
+    parsed, usage = run_analysis(comment, config, resolve_cache_path(args, config))
     print(format_result(parsed, usage))
 
-    if not args.no_log:
-        entry = build_log_entry(args.reddit_id, config, parsed, usage,
-                                mode="single", tag=args.tag)
-        append_log(args.log, entry)
+    with open_log(args) as log_file:
+        if log_file is not None:
+            entry = build_log_entry(comment['reddit_id'], config, parsed, usage,
+                                    mode="single", tag=args.tag)
+            append_log(log_file, entry)
 
 
-def cmd_multi_run(args):
+def cmd_multi_run(args, comment):
     """Run the same config N times and show consistency stats."""
-    comment = load_comment(args.db, args.reddit_id)
+    from statistics import fmean
+
     market_ctx = get_market_context_string(args)
 
     config = {
@@ -350,6 +647,7 @@ def cmd_multi_run(args):
         'max_tokens': args.max_tokens,
         'market_context': market_ctx,
         'system_prompt': None,
+        'response_format': args.response_format,
     }
     if args.system_prompt:
         with open(args.system_prompt) as f:
@@ -362,49 +660,50 @@ def cmd_multi_run(args):
     print()
     print(f"=== {args.runs} RUNS ===")
 
-    sentiments = []
+    counts = {}
     confidences = []
     total_cost = 0.0
 
-    for i in range(args.runs):
-        parsed, usage = run_analysis(comment, config)
-        tickers_str = ", ".join(
-            f"{t}({s})" for t, s in zip(parsed['tickers'], parsed['ticker_sentiments'])
-        ) or "none"
-
-        cost = (usage['prompt_tokens'] * COST_PER_1M_INPUT +
-                usage['completion_tokens'] * COST_PER_1M_OUTPUT) / 1_000_000
-        total_cost += cost
+    # Runs are independent, so issue them concurrently; gather() still returns
+    # results in run order
+    results = run_async(gather_analyses(comment, [config] * args.runs, [None] * args.runs))
+    with open_log(args) as log_file:
+        for i, (parsed, usage) in enumerate(results):
+            cost = (usage['prompt_tokens'] * COST_PER_1M_INPUT +
+                    usage['completion_tokens'] * COST_PER_1M_OUTPUT) / 1_000_000
+            total_cost += cost
 
-        sentiments.append(parsed['sentiment'])
-        confidences.append(parsed['confidence'])
+            counts[parsed['sentiment']] = counts.get(parsed['sentiment'], 0) + 1
+            confidences.append(parsed['confidence'])
 
-        if not args.no_log:
-            entry = build_log_entry(args.reddit_id, config, parsed, usage,
-                                    mode="multi", label=f"run-{i+1}", tag=args.tag)
-            append_log(args.log, entry)
+            if log_file is not None:
+                entry = build_log_entry(comment['reddit_id'], config, parsed, usage,
+                                        mode="multi", label=f"run-{i+1}", tag=args.tag)
+                append_log(log_file, entry)
 
-        print(f"Run {i+1}: {parsed['sentiment']:<8} @ {parsed['confidence']:<4} "
-              f"| tickers: {tickers_str}")
+            print(f"Run {i+1}: {parsed['sentiment']:<8} @ {parsed['confidence']:<4} "
+                  f"| tickers: {parsed['_tickers_str']}")
 
     print()
-    counts = Counter(sentiments)
-    total = len(sentiments)
-    consensus_parts = [f"{s} {c}/{total} ({c*100//total}%)" for s, c in counts.most_common()]
+    total = len(confidences)
+    # Stable sort: ties keep first-seen order, as Counter.most_common did
+    ranked = sorted(counts.items(), key=lambda item: -item[1])
+    consensus_parts = [f"{s} {c}/{total} ({c*100//total}%)" for s, c in ranked]
     print(f"Consensus: {' | '.join(consensus_parts)}")
 
     if len(confidences) > 1:
-        print(f"Confidence: mean={statistics.mean(confidences):.2f}, "
-              f"std={statistics.stdev(confidences):.2f}")
+        # Float mean/stdev; statistics.mean/stdev use exact fraction arithmetic
+        mean = fmean(confidences)
+        std = math.sqrt(sum((c - mean) ** 2 for c in confidences) / (len(confidences) - 1))
+        print(f"Confidence: mean={mean:.2f}, std={std:.2f}")
     else:
         print(f"Confidence: {confidences[0]:.2f}")
 
     print(f"Total cost: ${total_cost:.4f}")
 
 
-def cmd_compare(args):
+def cmd_compare(args, comment):
     """Compare two configs side-by-side on the same comment."""
-    comment = load_comment(args.db, args.reddit_id)
     base_market_ctx = get_market_context_string(args)
 
     configs = []
@@ -414,29 +713,29 @@ def cmd_compare(args):
     print(format_comment_header(comment))
     print()
 
+    # Analyze all configs concurrently; gather() keeps them in config order
+    cache_paths = [resolve_cache_path(args, config) for config in configs]
+    analyses = run_async(gather_analyses(comment, configs, cache_paths))
+
     results = []
-    for i, (cs, config) in enumerate(zip(args.compare, configs)):
-        label = chr(65 + i)  # A, B, C...
-        parsed, usage = run_analysis(comment, config)
-        results.append((label, cs, config, parsed, usage))
+    with open_log(args) as log_file:
+        for i, (cs, config, (parsed, usage)) in enumerate(zip(args.compare, configs, analyses)):
+            label = LABELS[i]
+            results.append((label, cs, config, parsed, usage))
 
-        if not args.no_log:
-            entry = build_log_entry(args.reddit_id, config, parsed, usage,
-                                    mode="compare", label=label, tag=args.tag)
-            append_log(args.log, entry)
+            if log_file is not None:
+                entry = build_log_entry(comment['reddit_id'], config, parsed, usage,
+                                        mode="compare", label=label, tag=args.tag)
+                append_log(log_file, entry)
 
     # Print side-by-side
     for label, cs, config, parsed, usage in results:
-        tickers_str = ", ".join(
-            f"{t}({s})" for t, s in zip(parsed['tickers'], parsed['ticker_sentiments'])
-        ) or "none"
-
         cost = (usage['prompt_tokens'] * COST_PER_1M_INPUT +
                 usage['completion_tokens'] * COST_PER_1M_OUTPUT) / 1_000_000
 
         print(f"=== CONFIG {label}: {cs} ===")
         print(f"Sentiment: {parsed['sentiment']} @ {parsed['confidence']}")
-        print(f"Tickers: {tickers_str}")
+        print(f"Tickers: {parsed['_tickers_str']}")
         print(f"Sarcasm: {'yes' if parsed['sarcasm_detected'] else 'no'} "
               f"| Reasoning: {'yes' if parsed['has_reasoning'] else 'no'}")
         if parsed.get('reasoning_summary'):
@@ -444,7 +743,8 @@ def cmd_compare(args):
             if len(summary) > 120:
                 summary = summary[:120] + "..."
             print(f"Summary: \"{summary}\"")
-        print(f"Tokens: {usage['prompt_tokens']}+{usage['completion_tokens']} (${cost:.4f})")
+        cached = " [cache hit]" if usage.get('cache_hit') else ""
+        print(f"Tokens: {usage['prompt_tokens']}+{usage['completion_tokens']} (${cost:.4f}){cached}")
         print()
 
 
@@ -457,8 +757,21 @@ def cmd_list_flips(args):
     conn = sqlite3.connect(args.db)
     conn.row_factory = sqlite3.Row
     conn.execute("ATTACH DATABASE ? AS new_db", (args.db2,))
-
-    rows = conn.execute("""
+    # Both databases are read in full by the join; map them and give each a
+    # large page cache
+    for schema in ("main", "new_db"):
+        conn.execute(f"PRAGMA {schema}.mmap_size = 268435456")  # 256 MB
+        conn.execute(f"PRAGMA {schema}.cache_size = -65536")  # 64 MB
+
+    min_delta_sql = ""
+    params = []
+    if args.min_delta is not None:
+        min_delta_sql = "AND ABS(n.ai_confidence - o.ai_confidence) >= ?"
+        params.append(args.min_delta)
+    # LIMIT -1 means no limit in SQLite; the sort is a top-K when limited
+    params.append(args.limit if args.limit > 0 else -1)
+
+    rows = conn.execute(f"""
         SELECT
             o.reddit_id,
             REPLACE(SUBSTR(o.body, 1, 80), char(10), ' ') AS body_preview,
@@ -472,8 +785,10 @@ def cmd_list_flips(args):
         WHERE o.sentiment IS NOT NULL
           AND n.sentiment IS NOT NULL
           AND o.sentiment <> n.sentiment
+          {min_delta_sql}
         ORDER BY ABS(n.ai_confidence - o.ai_confidence) DESC
-    """).fetchall()
+        LIMIT ?
+    """, params).fetchall()
 
     conn.close()
 
@@ -481,13 +796,18 @@ def cmd_list_flips(args):
         print("No sentiment flips found between the two databases.")
         return
 
-    print(f"Sentiment flips: {len(rows)} comments (sorted by confidence delta)\n")
+    shown = f"top {len(rows)}" if len(rows) == args.limit else str(len(rows))
+    print(f"Sentiment flips: {shown} comments (sorted by confidence delta)\n")
     print(f"{'reddit_id':<12} {'old->new':<20} {'Δconf':>6}  body")
     print("-" * 100)
+    # Format every row first and write the table in one call rather than
+    # one print() per flip
+    lines = []
     for row in rows:
         flip = f"{row['old_sentiment']}->{row['new_sentiment']}"
         delta = f"{row['conf_delta']:+.1f}" if row['conf_delta'] else " 0.0"
-        print(f"{row['reddit_id']:<12} {flip:<20} {delta:>6}  {row['body_preview']}")
+        lines.append(f"{row['reddit_id']:<12} {flip:<20} {delta:>6}  {row['body_preview']}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def parse_args():
@@ -502,6 +822,7 @@ Config strings for --compare (comma-separated key=value pairs):
   no-market-context         Disable market context
   market-context="..."      Custom market context string
   system-prompt=file.txt    Load system prompt from file
+  response-format=json_schema  Use structured outputs
 
 Examples:
   %(prog)s o50n9bi --dry-run
@@ -512,6 +833,7 @@ Examples:
         """)
 
     parser.add_argument("reddit_id", nargs="?", help="Reddit comment ID to analyze")
+    parser.add_argument("--ids-file", help="File of newline-separated comment IDs to analyze in turn")
     parser.add_argument("--db", default="data/wsb.db", help="Database path (default: data/wsb.db)")
     parser.add_argument("--db2", help="Second database for --list-flips comparison")
 
@@ -520,8 +842,12 @@ Examples:
     parser.add_argument("--temperature", type=float, default=DEFAULT_TEMPERATURE)
     parser.add_argument("--max-tokens", type=int, default=DEFAULT_MAX_TOKENS)
     parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--response-format", choices=RESPONSE_FORMATS, default=DEFAULT_RESPONSE_FORMAT,
+                        help="json_schema constrains output to the response schema (structured outputs)")
     parser.add_argument("--no-market-context", action="store_true", help="Disable market context")
     parser.add_argument("--market-context", help="Custom market context string")
+    parser.add_argument("--no-market-cache", action="store_true",
+                        help=f"Re-fetch live market context instead of reusing it for {MARKET_CONTEXT_TTL}s")
     parser.add_argument("--system-prompt", help="Path to custom system prompt file")
 
     # Logging
@@ -530,12 +856,23 @@ Examples:
     parser.add_argument("--no-log", action="store_true", help="Disable auto-logging")
     parser.add_argument("--tag", help="Label for this experiment (e.g. 'market-context-bias')")
 
+    # Response cache
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH,
+                        help=f"Response cache path (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API")
+    parser.add_argument("--cache-stochastic", action="store_true",
+                        help="Also cache responses sampled at temperature > 0 (deterministic replays)")
+
     # Modes
     parser.add_argument("--runs", type=int, help="Run N times and show consistency stats")
     parser.add_argument("--compare", nargs="+", metavar="CONFIG",
                         help="Compare configs side-by-side (e.g. 'temp=0.3' 'temp=0.7,no-market-context')")
     parser.add_argument("--list-flips", action="store_true",
                         help="List sentiment flips between --db and --db2")
+    parser.add_argument("--limit", type=int, default=DEFAULT_FLIPS_LIMIT,
+                        help=f"Max flips to list, 0 for all (default: {DEFAULT_FLIPS_LIMIT})")
+    parser.add_argument("--min-delta", type=float,
+                        help="Only list flips whose confidence changed by at least this much")
     parser.add_argument("--verbose", action="store_true", help="Show full prompts")
 
     return parser.parse_args()
@@ -548,16 +885,35 @@ def main():
         cmd_list_flips(args)
         return
 
-    if not args.reddit_id:
-        print("Error: reddit_id required (or use --list-flips)")
+    reddit_ids = [args.reddit_id] if args.reddit_id else []
+    if args.ids_file:
+        reddit_ids += read_ids_file(args.ids_file)
+    if not reddit_ids:
+        print("Error: reddit_id or --ids-file required (or use --list-flips)")
+        sys.exit(1)
+
+    # Load every comment up front in one query, then run the mode per comment
+    comments = load_comments(args.db, reddit_ids)
+    for reddit_id in reddit_ids:
+        if reddit_id not in comments:
+            print(f"Error: Comment '{reddit_id}' not found in {args.db}")
+            sys.exit(1)
+
+    if args.compare and len(args.compare) > len(LABELS):
+        print(f"Error: --compare takes at most {len(LABELS)} configs")
         sys.exit(1)
 
     if args.compare:
-        cmd_compare(args)
+        command = cmd_compare
     elif args.runs and args.runs > 1:
-        cmd_multi_run(args)
+        command = cmd_multi_run
     else:
-        cmd_single(args)
+        command = cmd_single
+
+    for i, reddit_id in enumerate(reddit_ids):
+        if i:
+            print()
+        command(args, comments[reddit_id])
 
 
 if __name__ == "__main__":
@@ -1,30 +1,98 @@
 """Batch processing and transaction management for AI analysis pipeline.
 
 This module handles Phase 3 (AI Analysis) batch processing, including:
-- Concurrent batch processing with ThreadPoolExecutor
+- Concurrent processing with asyncio (sliding window of 5 requests in flight)
 - Retry logic for malformed responses and rate limits
-- Atomic transaction commits for batches of 5 comments
+- Atomic transaction commits per write batch (analyze.py flushes up to
+  WRITE_FLUSH_SIZE = 100 results, or whatever arrived within
+  WRITE_FLUSH_SECONDS = 1.0, as one batch)
 - Author trust score persistence (no re-lookup from authors table)
 
 Key Functions:
     store_analysis_results — Persist AI analysis results with author_trust_score snapshot
-    commit_analysis_batch — Single transaction per batch of 5 comments
-    process_comments_in_batches — Main orchestrator
-    process_single_batch — ThreadPoolExecutor coordinator
+    commit_analysis_batch — Single transaction (or savepoint) per write batch
+    process_comments_in_batches — Main orchestrator (sliding window of 5 in-flight requests)
+    process_single_batch — asyncio.gather over one fixed list (not on the Phase 3 path)
     process_comment_with_retry — Retry handler for individual comments
     store_comment_tickers — Junction table persistence
+    store_all_comment_tickers — Junction table persistence for a whole batch
 """
 
 import json
 import sqlite3
 import structlog
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
-import concurrent.futures
 import asyncio
 from openai import RateLimitError
 
+from src.ai_parser import parse_ai_response, MalformedResponseError
+from src.prompts import SYSTEM_PROMPT, build_user_prompt
+
 logger = structlog.get_logger()
 
+# Max reddit_ids per existence-check IN (...) query (below SQLite's 999 bound-parameter floor)
+EXISTING_LOOKUP_CHUNK_SIZE = 500
+
+# Max OpenAI requests in flight at once during Phase 3
+MAX_CONCURRENT_REQUESTS = 5
+
+
+def _sqlite_utc(timestamp: Optional[float] = None) -> Optional[str]:
+    """Format a Unix timestamp (default: now) like SQLite's datetime() in UTC.
+
+    Matches datetime('now') / datetime(?, 'unixepoch') output
+    ('YYYY-MM-DD HH:MM:SS') so values bound from Python compare and sort
+    alongside timestamps written by SQL elsewhere. None stays None.
+    """
+    if timestamp is None:
+        moment = datetime.now(timezone.utc)
+    else:
+        moment = datetime.fromtimestamp(float(timestamp), timezone.utc)
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _created_at(created_utc: Any) -> Optional[str]:
+    """Convert a comment's created_utc (Unix seconds) to the stored UTC string.
+
+    Missing or unconvertible values (non-numeric, out of range) become None,
+    as datetime(?, 'unixepoch') returned NULL for them.
+    """
+    if created_utc is None:
+        return None
+    try:
+        return _sqlite_utc(created_utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _select_by_reddit_id(
+    conn: sqlite3.Connection,
+    columns: str,
+    reddit_ids: List[str]
+) -> Dict[str, Any]:
+    """Fetch comments rows keyed by reddit_id with one IN (...) query per chunk.
+
+    Args:
+        conn: SQLite database connection (row_factory = sqlite3.Row)
+        columns: Column list to select; must include reddit_id
+        reddit_ids: reddit_ids to look up (missing ids are simply absent)
+
+    Returns:
+        Dict mapping reddit_id to its row
+    """
+    rows_by_id: Dict[str, Any] = {}
+    for i in range(0, len(reddit_ids), EXISTING_LOOKUP_CHUNK_SIZE):
+        chunk = reddit_ids[i:i + EXISTING_LOOKUP_CHUNK_SIZE]
+        placeholders = ','.join('?' * len(chunk))
+        rows = conn.execute(
+            f"SELECT {columns} FROM comments WHERE reddit_id IN ({placeholders})",
+            chunk
+        ).fetchall()
+        for row in rows:
+            rows_by_id[row['reddit_id']] = row
+    return rows_by_id
+
 
 def calculate_backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0) -> float:
     """Calculate exponential backoff delay for retry attempts.
@@ -92,9 +160,6 @@ async def process_comment_with_retry(
         ...     # Comment was skipped after retries
         ...     pass
     """
-    from src.prompts import SYSTEM_PROMPT, build_user_prompt
-    from src.ai_parser import parse_ai_response, MalformedResponseError
-
     retry_logger = structlog.get_logger()
 
     # Build prompts if not provided
@@ -205,12 +270,15 @@ def store_analysis_results(
     run_id: int,
     analysis_results: List[Dict[str, Any]],
     prompt_config_id: Optional[int] = None,
-) -> None:
+    analyzed_at: Optional[str] = None,
+) -> Dict[str, int]:
     """Persist AI analysis results for a batch of comments.
 
     This function handles Phase 3 storage — inserting or updating comment records
     with AI annotations after analysis. It preserves the author_trust_score that
     was set during Phase 2 (story-002-005) and persists it to the database.
+    Existing rows are found with one batched SELECT, and rows are written with
+    one executemany per statement (INSERT, UPDATE) rather than per comment.
 
     Key behaviors:
     - INSERT if comment doesn't exist (includes author_trust_score from result dict)
@@ -218,8 +286,8 @@ def store_analysis_results(
     - Does NOT query the authors table (Phase 2 already did the lookup)
     - Each result dict contains the author_trust_score from Phase 2
 
-    This function is called by commit_analysis_batch() as part of the batch-of-5
-    transaction commit (story-003-008).
+    This function is called by commit_analysis_batch() as part of its batch
+    transaction (story-003-008).
 
     Args:
         conn: SQLite database connection (within an active transaction)
@@ -240,6 +308,12 @@ def store_analysis_results(
             - depth: int — Nesting depth (optional, for new comments)
             - created_utc: int — Unix timestamp (optional, for new comments)
             - prioritization_score: float — Priority score (optional, for new comments)
+        prompt_config_id: Prompt config FK recorded on each comment (optional)
+        analyzed_at: UTC 'YYYY-MM-DD HH:MM:SS' stamp for every row (default: now)
+
+    Returns:
+        Dict mapping each stored reddit_id to its comments.id. Updated rows reuse
+        the id from the existence check; only newly inserted rows are re-queried.
 
     Example:
         >>> analysis_results = [
@@ -254,8 +328,22 @@ def store_analysis_results(
         ...         'tickers': ['AAPL']
         ...     }
         ... ]
-        >>> store_analysis_results(conn, run_id=1, analysis_results=analysis_results)
+        >>> id_map = store_analysis_results(conn, run_id=1, analysis_results=analysis_results)
     """
+    if not analysis_results:
+        return {}
+
+    if analyzed_at is None:
+        analyzed_at = _sqlite_utc()
+
+    # Look up which comments already exist in one query per chunk of ids,
+    # instead of one SELECT per result
+    reddit_ids = [result['reddit_id'] for result in analysis_results]
+    existing = _select_by_reddit_id(conn, "reddit_id, id, author_trust_score", reddit_ids)
+
+    inserts = []
+    updates = []
+    queued_inserts = set()
     for result in analysis_results:
         reddit_id = result['reddit_id']
         post_db_id = result['post_id']  # This is already the DB FK
@@ -266,63 +354,40 @@ def store_analysis_results(
         if reasoning_summary is not None and not isinstance(reasoning_summary, str):
             reasoning_summary = json.dumps(reasoning_summary)
 
-        # Check if comment exists
-        existing_cursor = conn.execute(
-            "SELECT id, author_trust_score FROM comments WHERE reddit_id = ?",
-            (reddit_id,)
-        )
-        existing = existing_cursor.fetchone()
-
         # Resolve prompt_config_id: per-result overrides batch-level
         effective_config_id = result.get('prompt_config_id', prompt_config_id)
 
-        if existing:
+        if reddit_id in existing or reddit_id in queued_inserts:
             # UPDATE path: preserve existing author_trust_score (dedup)
             # Only update AI annotations, not the trust score
-            conn.execute("""
-                UPDATE comments
-                SET sentiment = ?,
-                    sarcasm_detected = ?,
-                    has_reasoning = ?,
-                    reasoning_summary = ?,
-                    ai_confidence = ?,
-                    prompt_config_id = ?,
-                    analyzed_at = datetime('now')
-                WHERE reddit_id = ?
-            """, (
+            updates.append((
                 result.get('sentiment'),
                 result.get('sarcasm_detected', False),
                 result.get('has_reasoning', False),
                 reasoning_summary,
                 result.get('ai_confidence'),
                 effective_config_id,
+                analyzed_at,
                 reddit_id
             ))
 
-            logger.debug(
-                "updated_comment_ai_annotations",
-                reddit_id=reddit_id,
-                preserved_trust_score=existing['author_trust_score']
-            )
+            if reddit_id in existing:
+                logger.debug(
+                    "updated_comment_ai_annotations",
+                    reddit_id=reddit_id,
+                    preserved_trust_score=existing[reddit_id]['author_trust_score']
+                )
 
         else:
             # INSERT path: include author_trust_score from analysis result
             # This is the Phase 2 snapshot, NOT a new lookup
-            conn.execute("""
-                INSERT INTO comments (
-                    analysis_run_id, post_id, reddit_id, author, body, created_utc,
-                    score, depth, prioritization_score, sentiment, sarcasm_detected,
-                    has_reasoning, reasoning_summary, ai_confidence, author_trust_score,
-                    prompt_config_id, analyzed_at
-                )
-                VALUES (?, ?, ?, ?, ?, datetime(?, 'unixepoch'), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-            """, (
+            inserts.append((
                 run_id,
                 post_db_id,
                 reddit_id,
                 result.get('author', 'unknown'),
                 result.get('body', ''),
-                result.get('created_utc', 0),
+                _created_at(result.get('created_utc', 0)),
                 result.get('score', 0),
                 result.get('depth', 0),
                 result.get('prioritization_score', 0.0),
@@ -333,7 +398,10 @@ def store_analysis_results(
                 result.get('ai_confidence'),
                 author_trust_score,  # Phase 2 snapshot, NOT a new lookup
                 effective_config_id,
+                analyzed_at,
             ))
+            # A repeated reddit_id later in the same batch updates this row
+            queued_inserts.add(reddit_id)
 
             logger.debug(
                 "inserted_comment_with_ai_annotations",
@@ -341,6 +409,37 @@ def store_analysis_results(
                 author_trust_score=author_trust_score
             )
 
+    # Inserts first so an in-batch repeat's UPDATE sees the new row
+    if inserts:
+        conn.executemany("""
+            INSERT INTO comments (
+                analysis_run_id, post_id, reddit_id, author, body, created_utc,
+                score, depth, prioritization_score, sentiment, sarcasm_detected,
+                has_reasoning, reasoning_summary, ai_confidence, author_trust_score,
+                prompt_config_id, analyzed_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, inserts)
+
+    if updates:
+        conn.executemany("""
+            UPDATE comments
+            SET sentiment = ?,
+                sarcasm_detected = ?,
+                has_reasoning = ?,
+                reasoning_summary = ?,
+                ai_confidence = ?,
+                prompt_config_id = ?,
+                analyzed_at = ?
+            WHERE reddit_id = ?
+        """, updates)
+
+    id_map = {reddit_id: row['id'] for reddit_id, row in existing.items()}
+    if queued_inserts:
+        inserted = _select_by_reddit_id(conn, "reddit_id, id", list(queued_inserts))
+        id_map.update((reddit_id, row['id']) for reddit_id, row in inserted.items())
+    return id_map
+
 
 async def process_single_batch(
     comments: List[Dict[str, Any]],
@@ -348,86 +447,95 @@ async def process_single_batch(
     run_id: int,
     market_context: Optional[str] = None
 ) -> List[Tuple[Dict[str, Any], Any]]:
-    """Process a single batch of comments concurrently using ThreadPoolExecutor.
+    """Process a fixed list of comments concurrently and return once all finish.
 
-    Each comment in the batch is processed in parallel by a separate worker thread.
-    Each worker sends one comment to OpenAI (1 comment per API call). Each comment
-    is processed with retry logic for malformed JSON and rate limits via
-    process_comment_with_retry(). If a worker fails after retries, the remaining
-    workers continue normally and the failure is logged with the reddit_id for attribution.
+    Not used by the Phase 3 pipeline: process_comments_in_batches() runs its
+    own sliding window over all comments instead of fixed batches. This
+    function is kept for callers that want one list analyzed as a unit.
+
+    Each comment is sent to OpenAI in its own coroutine (1 comment per API
+    call) and all of them are awaited together with asyncio.gather, with an
+    asyncio.Semaphore capping the requests in flight at
+    MAX_CONCURRENT_REQUESTS. Each comment is processed with retry logic for
+    malformed JSON and rate limits via process_comment_with_retry(). If a
+    comment fails after retries, the others continue normally and the
+    failure is logged with the reddit_id for attribution.
 
     Args:
-        comments: List of up to 5 comment dicts (reddit_id, body, author, etc.)
+        comments: List of comment dicts (reddit_id, body, author, etc.), of any
+            length; at most MAX_CONCURRENT_REQUESTS are in flight at once
         openai_client: OpenAI client instance with send_chat_completion method
         run_id: Analysis run ID (for logging context)
 
     Returns:
-        List of (comment, result_or_error) tuples for successful workers.
-        Failed workers are logged but not included in the return list.
+        List of (comment, result) tuples for successful comments, in input order.
+        Failed comments are logged but not included in the return list.
     """
-    results = []
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    outcomes = await asyncio.gather(
+        *(_analyze_bounded(semaphore, comment, openai_client, run_id, market_context)
+          for comment in comments)
+    )
 
-    def process_single_comment(comment: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
-        """Synchronous wrapper for processing a single comment (runs in thread pool)."""
-        try:
-            # Create a new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                # Call process_comment_with_retry (handles malformed JSON and rate limit retries)
-                result = loop.run_until_complete(
-                    process_comment_with_retry(comment, openai_client, run_id,
-                                              market_context=market_context)
-                )
+    return [
+        (comment, outcome)
+        for comment, outcome in zip(comments, outcomes)
+        if _succeeded(comment, outcome, run_id)
+    ]
 
-                # If result is None, the comment was skipped after retries
-                if result is None:
-                    raise ValueError(f"Comment {comment.get('reddit_id', 'unknown')} skipped after retries")
 
-                return (comment, result)
-            finally:
-                loop.close()
+async def _analyze_bounded(
+    semaphore: asyncio.Semaphore,
+    comment: Dict[str, Any],
+    openai_client: Any,
+    run_id: int,
+    market_context: Optional[str]
+) -> Any:
+    """Run process_comment_with_retry() under semaphore; return its result or exception.
 
+    The semaphore is created per call by the caller rather than at module level,
+    since asyncio primitives bind to the event loop that first waits on them.
+    """
+    async with semaphore:
+        try:
+            return await process_comment_with_retry(comment, openai_client, run_id,
+                                                    market_context=market_context)
         except Exception as e:
-            # Log error with reddit_id for attribution
-            # Use structlog.get_logger() to get the current logger (allows mocking)
-            error_logger = structlog.get_logger()
-            error_logger.error(
-                "ai_worker_failed",
-                reddit_id=comment.get('reddit_id', 'unknown'),
-                error_type=type(e).__name__,
-                error_message=str(e),
-                run_id=run_id
-            )
-            raise  # Re-raise so future tracks this as failed
-
-    # Use ThreadPoolExecutor with max_workers=5
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        # Submit all comments to the executor
-        future_to_comment = {
-            executor.submit(process_single_comment, comment): comment
-            for comment in comments
-        }
-
-        # Collect results as they complete
-        for future in concurrent.futures.as_completed(future_to_comment):
-            comment = future_to_comment[future]
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                # Worker failed - already logged in process_single_comment
-                # Don't include in results, but continue with other workers
-                pass
-
-    return results
+            return e
+
+
+def _succeeded(comment: Dict[str, Any], outcome: Any, run_id: int) -> bool:
+    """Return True if outcome is an analysis result; log the failure otherwise.
+
+    outcome is what process_comment_with_retry() returned or raised: a parsed
+    result, None (skipped after retries), or an exception.
+    """
+    if outcome is None:
+        # Comment was skipped after retries
+        outcome = ValueError(f"Comment {comment.get('reddit_id', 'unknown')} skipped after retries")
+
+    if not isinstance(outcome, BaseException):
+        return True
+
+    # Log error with reddit_id for attribution
+    # Use structlog.get_logger() to get the current logger (allows mocking)
+    error_logger = structlog.get_logger()
+    error_logger.error(
+        "ai_worker_failed",
+        reddit_id=comment.get('reddit_id', 'unknown'),
+        error_type=type(outcome).__name__,
+        error_message=str(outcome),
+        run_id=run_id
+    )
+    return False
 
 
 def store_comment_tickers(
     conn: sqlite3.Connection,
     comment_id: int,
     tickers: List[str],
-    sentiments: List[str]
+    sentiments: List[str],
+    created_at: Optional[str] = None
 ) -> None:
     """Insert ticker-sentiment pairs into comment_tickers junction table.
 
@@ -440,6 +548,7 @@ def store_comment_tickers(
         comment_id: Database FK to comments.id (NOT reddit_id)
         tickers: List of ticker symbols (will be normalized to uppercase)
         sentiments: List of sentiments corresponding to tickers (same length)
+        created_at: UTC 'YYYY-MM-DD HH:MM:SS' stamp for every row (default: now)
 
     Example:
         >>> store_comment_tickers(conn, comment_id=123, tickers=['AAPL', 'MSFT'], sentiments=['bullish', 'neutral'])
@@ -447,15 +556,50 @@ def store_comment_tickers(
     if not tickers:
         return
 
-    for ticker, sentiment in zip(tickers, sentiments):
-        # Normalize ticker to uppercase
-        normalized_ticker = ticker.upper()
+    # Normalize tickers to uppercase
+    created_at = created_at or _sqlite_utc()
+    _insert_comment_tickers(conn, [
+        (comment_id, ticker.upper(), sentiment, created_at)
+        for ticker, sentiment in zip(tickers, sentiments)
+    ])
 
-        # INSERT OR IGNORE to prevent duplicate (comment_id, ticker) pairs
-        conn.execute("""
-            INSERT OR IGNORE INTO comment_tickers (comment_id, ticker, sentiment, created_at)
-            VALUES (?, ?, ?, datetime('now'))
-        """, (comment_id, normalized_ticker, sentiment))
+
+def store_all_comment_tickers(
+    conn: sqlite3.Connection,
+    id_map: Dict[str, int],
+    batch_results: List[Dict[str, Any]],
+    created_at: Optional[str] = None
+) -> None:
+    """Insert the ticker-sentiment pairs of a whole batch into comment_tickers.
+
+    Builds one flat row list across every result and writes it with a single
+    executemany, using the reddit_id -> comments.id map returned by
+    store_analysis_results() instead of looking each comment up again.
+
+    Args:
+        conn: SQLite database connection (within an active transaction)
+        id_map: reddit_id -> comments.id for the batch's stored comments
+        batch_results: Result dicts with reddit_id, tickers and ticker_sentiments
+        created_at: UTC 'YYYY-MM-DD HH:MM:SS' stamp for every row (default: now)
+    """
+    created_at = created_at or _sqlite_utc()
+    rows = [
+        (id_map[result['reddit_id']], ticker.upper(), sentiment, created_at)
+        for result in batch_results
+        if result.get('tickers') and result['reddit_id'] in id_map
+        for ticker, sentiment in zip(result['tickers'], result.get('ticker_sentiments', []))
+    ]
+    if rows:
+        _insert_comment_tickers(conn, rows)
+
+
+def _insert_comment_tickers(conn: sqlite3.Connection, rows: List[Tuple[int, str, str, str]]) -> None:
+    """Insert (comment_id, ticker, sentiment, created_at) rows with a single executemany."""
+    # INSERT OR IGNORE to prevent duplicate (comment_id, ticker) pairs
+    conn.executemany("""
+        INSERT OR IGNORE INTO comment_tickers (comment_id, ticker, sentiment, created_at)
+        VALUES (?, ?, ?, ?)
+    """, rows)
 
 
 def commit_analysis_batch(
@@ -463,23 +607,34 @@ def commit_analysis_batch(
     run_id: int,
     batch_results: List[Dict[str, Any]],
     prompt_config_id: Optional[int] = None,
+    commit: bool = True,
 ) -> None:
     """Commit a batch of analyzed comments in a single SQLite transaction.
 
-    This function implements the batch-of-5 commit pattern for Phase 3 AI analysis.
-    Each batch (typically 5 comments, but may be fewer for the final batch) is
-    committed atomically. On SQLite error, the entire batch is rolled back and
-    the error is logged. Rolled-back comments are NOT retried.
+    Phase 3 results are written in batches sized by the caller: analyze.py's
+    writer flushes up to WRITE_FLUSH_SIZE (100) results, or whatever arrived
+    within WRITE_FLUSH_SECONDS (1.0), per call. Each batch is written
+    atomically. On SQLite error, the entire batch is rolled back and the
+    error is logged. Rolled-back comments are NOT retried. If no transaction
+    is open yet, the batch starts one with BEGIN IMMEDIATE so the writer lock
+    is held from the first statement.
+
+    When commit=False the caller owns an outer transaction (analyze.py wraps
+    each flush in BEGIN IMMEDIATE / COMMIT). The batch is then written inside
+    a SAVEPOINT so a failing batch rolls back on its own without discarding
+    other work in the caller's transaction, and no COMMIT is issued here.
 
     Transaction includes:
     - INSERT/UPDATE comment records with AI annotations
-    - INSERT comment_tickers junction table records
+    - INSERT comment_tickers junction table records (one executemany per batch)
     - All operations are atomic (all succeed or all rollback)
 
     Args:
         db_conn: SQLite database connection
         run_id: Foreign key to analysis_runs.id
-        batch_results: List of dicts with analysis results (typically 5, may be fewer)
+        batch_results: List of dicts with analysis results (one write flush, up to 100)
+        prompt_config_id: Prompt config FK recorded on each comment (optional)
+        commit: Commit after the batch (default). False defers to the caller's transaction.
 
     Example:
         >>> batch_results = [
@@ -502,29 +657,30 @@ def commit_analysis_batch(
 
     batch_logger = structlog.get_logger()
 
-    try:
-        # Store all comment records with AI annotations
-        # SQLite starts an implicit transaction on the first write
-        store_analysis_results(db_conn, run_id, batch_results, prompt_config_id)
+    if not commit:
+        db_conn.execute("SAVEPOINT analysis_batch")
+    elif not db_conn.in_transaction:
+        # Take the writer lock up front rather than letting the implicit
+        # DEFERRED transaction upgrade (and possibly hit SQLITE_BUSY) mid-batch
+        db_conn.execute("BEGIN IMMEDIATE")
 
-        # Store comment_tickers junction records for each comment
-        for result in batch_results:
-            # Get the comment_id for this reddit_id
-            comment_row = db_conn.execute(
-                "SELECT id FROM comments WHERE reddit_id = ?",
-                (result['reddit_id'],)
-            ).fetchone()
+    try:
+        # One timestamp for the whole batch, bound as a parameter per row
+        now = _sqlite_utc()
 
-            if comment_row:
-                comment_id = comment_row['id']
-                tickers = result.get('tickers', [])
-                ticker_sentiments = result.get('ticker_sentiments', [])
+        # Store all comment records with AI annotations
+        id_map = store_analysis_results(db_conn, run_id, batch_results, prompt_config_id,
+                                        analyzed_at=now)
 
-                if tickers:
-                    store_comment_tickers(db_conn, comment_id, tickers, ticker_sentiments)
+        # Store every comment_tickers junction record in one executemany,
+        # keyed by the comment ids store_analysis_results already resolved
+        store_all_comment_tickers(db_conn, id_map, batch_results, created_at=now)
 
-        # Commit the transaction
-        db_conn.commit()
+        # Commit the transaction (or just close the savepoint)
+        if commit:
+            db_conn.commit()
+        else:
+            db_conn.execute("RELEASE analysis_batch")
 
         batch_logger.debug(
             "batch_committed",
@@ -534,7 +690,11 @@ def commit_analysis_batch(
 
     except sqlite3.Error as e:
         # Rollback entire batch on SQLite error
-        db_conn.rollback()
+        if commit:
+            db_conn.rollback()
+        else:
+            db_conn.execute("ROLLBACK TO analysis_batch")
+            db_conn.execute("RELEASE analysis_batch")
 
         # Extract reddit_ids for logging
         reddit_ids = [result.get('reddit_id', 'unknown') for result in batch_results]
@@ -557,12 +717,15 @@ async def process_comments_in_batches(
     openai_client: Optional[Any] = None,
     market_context: Optional[str] = None,
     prompt_config_id: Optional[int] = None,
+    queue: Optional[asyncio.Queue] = None,
 ) -> List[Dict[str, Any]]:
-    """Main orchestrator for concurrent AI batch processing.
+    """Main orchestrator for concurrent AI analysis.
 
-    Groups comments into batches of 5 and processes each batch concurrently.
-    Each batch completes before proceeding to the next batch. Progress is logged
-    after each batch completes.
+    Keeps up to MAX_CONCURRENT_REQUESTS comments in flight at once (1 comment
+    per API call) as a sliding window: a new request starts as soon as any
+    in-flight one finishes, so a single slow response no longer holds back the
+    comments queued behind it. Results are handled in completion order and
+    progress is logged every MAX_CONCURRENT_REQUESTS completed comments.
 
     This function is the entry point for Phase 3 AI analysis after deduplication.
 
@@ -571,14 +734,18 @@ async def process_comments_in_batches(
         run_id: Analysis run ID
         db_conn: SQLite database connection (optional, for future use)
         openai_client: OpenAI client instance (optional, created if not provided)
+        queue: If given, each successful (comment, result) pair is also put on
+            this queue as soon as it completes, so a consumer can write results
+            to the database while other requests are still in flight
 
     Returns:
-        List of all analysis results from all batches (flattened)
+        List of (comment, result) pairs for all successful comments, in
+        completion order
 
     Example:
         >>> comments = [{'reddit_id': f'c{i}', 'body': f'Text {i}'} for i in range(12)]
         >>> results = await process_comments_in_batches(comments, run_id=1)
-        >>> # Processes as 3 batches: [5, 5, 2]
+        >>> # At most 5 requests in flight at any time
     """
     batch_logger = structlog.get_logger()
 
@@ -587,62 +754,54 @@ async def process_comments_in_batches(
         return []
 
     # Initialize OpenAI client if not provided (lazy initialization avoids
-    # creating client when process_single_batch is mocked in tests)
-    client_created = False
+    # creating client when process_comment_with_retry is mocked in tests)
     if openai_client is None:
         # Try to create client, but if it fails (e.g., missing API key in tests),
-        # we'll use a placeholder since process_single_batch might be mocked
+        # we'll use a placeholder since process_comment_with_retry might be mocked
         try:
             from src.ai_client import OpenAIClient
             openai_client = OpenAIClient()
-            client_created = True
         except (ValueError, ImportError):
             # If we can't create a client (e.g., in tests without API key),
-            # use a placeholder - process_single_batch might be mocked
+            # use a placeholder - process_comment_with_retry might be mocked
             openai_client = object()  # Placeholder for mocked scenarios
 
-    # Calculate batch count
-    batch_size = 5
-    total_batches = (len(comments) + batch_size - 1) // batch_size  # Ceiling division
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def analyze(comment: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+        return comment, await _analyze_bounded(semaphore, comment, openai_client,
+                                               run_id, market_context)
 
     all_results = []
     completed_count = 0
+    tasks = [asyncio.ensure_future(analyze(comment)) for comment in comments]
 
-    # Process in batches of 5
-    for batch_idx in range(total_batches):
-        start_idx = batch_idx * batch_size
-        end_idx = min(start_idx + batch_size, len(comments))
-        batch = comments[start_idx:end_idx]
-
-        batch_logger.debug(
-            "processing_batch",
-            batch_number=batch_idx + 1,
-            total_batches=total_batches,
-            batch_size=len(batch),
-            run_id=run_id
-        )
-
-        # Process this batch concurrently
-        batch_results = await process_single_batch(batch, openai_client, run_id,
-                                                   market_context=market_context)
-
-        # Collect results
-        all_results.extend(batch_results)
-        completed_count += len(batch)
-
-        # Log progress after batch completes
-        batch_logger.info(
-            f"Processed batch {batch_idx + 1}/{total_batches}: {completed_count} comments complete",
-            batch_number=batch_idx + 1,
-            total_batches=total_batches,
-            completed=completed_count,
-            total_comments=len(comments),
-            run_id=run_id
-        )
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            comment, outcome = await next_done
+            completed_count += 1
+
+            if _succeeded(comment, outcome, run_id):
+                all_results.append((comment, outcome))
+                # Hand the result to the consumer as soon as it is done
+                if queue is not None:
+                    await queue.put((comment, outcome))
+
+            # Log progress every MAX_CONCURRENT_REQUESTS comments and at the end
+            if completed_count % MAX_CONCURRENT_REQUESTS == 0 or completed_count == len(comments):
+                batch_logger.info(
+                    f"Processed {completed_count}/{len(comments)} comments",
+                    completed=completed_count,
+                    total_comments=len(comments),
+                    run_id=run_id
+                )
+    finally:
+        # Don't leave requests running if the caller is cancelled part-way
+        for task in tasks:
+            task.cancel()
 
     batch_logger.info(
         "batch_processing_complete",
-        total_batches=total_batches,
         total_comments=len(comments),
         successful_results=len(all_results),
         run_id=run_id
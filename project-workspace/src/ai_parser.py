@@ -71,6 +71,31 @@ COMPANY_NAME_MAP = {
 # Exclusion list: common words that are not tickers (configurable)
 TICKER_EXCLUSION_LIST = {'I', 'A', 'CEO', 'DD', 'YOLO'}
 
+# The 7 fields every AI response must contain
+REQUIRED_FIELDS = [
+    'tickers', 'ticker_sentiments', 'sentiment', 'sarcasm_detected',
+    'has_reasoning', 'confidence', 'reasoning_summary'
+]
+
+_SENTIMENT_SCHEMA = {"type": "string", "enum": ["bullish", "bearish", "neutral"]}
+
+# JSON schema for OpenAI structured outputs (response_format type
+# "json_schema", strict mode): the same 7 fields parse_ai_response validates
+AI_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tickers": {"type": "array", "items": {"type": "string"}},
+        "ticker_sentiments": {"type": "array", "items": _SENTIMENT_SCHEMA},
+        "sentiment": _SENTIMENT_SCHEMA,
+        "sarcasm_detected": {"type": "boolean"},
+        "has_reasoning": {"type": "boolean"},
+        "confidence": {"type": "number"},
+        "reasoning_summary": {"type": ["string", "null"]},
+    },
+    "required": REQUIRED_FIELDS,
+    "additionalProperties": False,
+}
+
 
 def parse_ai_response(raw_content: str) -> Dict[str, Any]:
     """Extract and validate AI response JSON.
@@ -128,12 +153,7 @@ def parse_ai_response(raw_content: str) -> Dict[str, Any]:
         raise MalformedResponseError(f"Invalid JSON: {e}")
 
     # Validate required fields
-    required_fields = [
-        'tickers', 'ticker_sentiments', 'sentiment', 'sarcasm_detected',
-        'has_reasoning', 'confidence', 'reasoning_summary'
-    ]
-
-    missing_fields = [f for f in required_fields if f not in data]
+    missing_fields = [f for f in REQUIRED_FIELDS if f not in data]
     if missing_fields:
         structlog.get_logger().warning("Missing required fields in AI response", missing=missing_fields)
         raise ValueError(f"Missing required fields: {missing_fields}")
@@ -0,0 +1,46 @@
+"""Load the project .env file into os.environ.
+
+Every pipeline script loads .env before importing the rest of src. The
+result is cached, so repeat calls within one process (a script importing
+another script, tests, or a driver running several stages) don't re-read
+the file. Variables already set in the environment always win.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None  # type: ignore[assignment]
+
+# KEY=VALUE on one line, surrounding whitespace trimmed. Comment and blank
+# lines don't match.
+_ENV_LINE_RE = re.compile(r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
+
+# project-workspace/.env
+ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env")
+
+
+@lru_cache(maxsize=1)
+def load_dotenv_once(env_path: str = ENV_PATH) -> None:
+    """Load env_path into os.environ without overriding existing variables.
+
+    Uses python-dotenv when installed, otherwise a single regex pass over
+    the file for KEY=VALUE lines (matching surrounding quotes are removed,
+    as python-dotenv does).
+    """
+    if not os.path.isfile(env_path):
+        return
+
+    if load_dotenv is not None:
+        load_dotenv(env_path, override=False)
+        return
+
+    with open(env_path) as f:
+        text = f.read()
+    for key, value in _ENV_LINE_RE.findall(text):
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        os.environ.setdefault(key, value)
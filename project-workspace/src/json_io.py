@@ -0,0 +1,127 @@
+"""JSON file helpers for the pipeline stage files.
+
+The stage files (fetched.json, scored.json, to_analyze.json) run to several
+MB of nested comment data, so parsing/serialization is a noticeable share of
+each stage's runtime. orjson is used when installed; the stdlib json module
+is the fallback and produces equivalent output.
+"""
+
+import json
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import ijson
+except ImportError:
+    ijson = None  # type: ignore[assignment]
+
+
+def load_json(path: str) -> Any:
+    """Read and parse a JSON file."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path) as f:
+        return json.load(f)
+
+
+def stream_json(path: str, header_key: str, array_key: str) -> tuple[Any, Iterator[Any]]:
+    """Read data[header_key] and lazily iterate the items of data[array_key].
+
+    With ijson installed (its yajl2_c backend is picked automatically when
+    compiled) items are parsed one at a time, so only the header and the
+    current item are held in memory. The header is read with a separate
+    pass that stops as soon as it is complete; stage files write metadata
+    first, so this only touches the start of the file. Without ijson the
+    whole file is loaded and its array iterated.
+    """
+    if ijson is None:
+        data = load_json(path)
+        return data[header_key], iter(data[array_key])
+
+    with open(path, "rb") as f:
+        header = next(ijson.items(f, header_key, use_float=True), None)
+
+    def items() -> Iterator[Any]:
+        with open(path, "rb") as f:
+            yield from ijson.items(f, f"{array_key}.item", use_float=True)
+
+    return header, items()
+
+
+# Stage files run to several MB; write them in 1 MB chunks rather than 8 KB
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type) -> tuple:
+    """Dataclass field names, computed once per class."""
+    return tuple(f.name for f in fields(cls))
+
+
+def _default(obj: Any) -> Any:
+    """Serialize dataclasses as their declared fields, datetimes as ISO 8601,
+    anything else via str().
+
+    Unlike dataclasses.asdict this is shallow: nested dataclasses and lists
+    are not copied up front but converted as the encoder reaches them.
+    Attributes set outside the declared fields (e.g. scoring scratch values)
+    are left out, as they were with asdict.
+    """
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {name: getattr(obj, name) for name in _field_names(type(obj))}
+    if isinstance(obj, datetime):
+        return obj.isoformat()  # Same format orjson emits natively
+    return str(obj)
+
+
+def dump_json(data: Any, path: str, indent: bool = True) -> None:
+    """Write data to path as JSON, 2-space indented unless indent=False.
+
+    Compact output is for machine-to-machine files that nobody reads by hand;
+    it is smaller and faster to write and parse.
+
+    Dataclass instances (e.g. ProcessedPost) can be passed directly, with no
+    asdict() conversion, and datetimes are written as ISO 8601. Other values
+    JSON can't represent natively are written via str(), matching the
+    previous json.dump(..., default=str) behavior.
+    """
+    if orjson is not None:
+        option = orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        with open(path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(data, default=_default, option=option))
+        return
+    # json.dumps rather than json.dump: dump streams many small chunks from
+    # the pure-Python encoder, while dumps builds one string (with the C
+    # encoder when compact) that goes out in a single buffered write.
+    if indent:
+        text = json.dumps(data, indent=2, default=_default)
+    else:
+        text = json.dumps(data, separators=(",", ":"), default=_default)
+    with open(path, "w", buffering=_WRITE_BUFFER_SIZE) as f:
+        f.write(text)
+
+
+def dumps_line(data: Any) -> bytes:
+    """Serialize data as one compact, newline-terminated JSON Lines record.
+
+    Values are converted as in dump_json. Returns UTF-8 bytes for a file
+    opened in binary append mode.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            default=_default,
+            option=orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_APPEND_NEWLINE,
+        )
+    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_default)
+    return (text + "\n").encode("utf-8")
@@ -7,7 +7,7 @@ engagement scoring, depth penalty calculation, and priority score computation.
 
 import math
 import re
-from typing import Optional
+from typing import Iterable, Optional
 import structlog
 
 # Import data models for type hints
@@ -101,19 +101,20 @@ def score_financial_keywords(
 
 def lookup_author_trust_scores(
     db_connection,
-    authors: list[str],
+    authors: Iterable[str],
     default_trust: float = 0.5
 ) -> dict[str, float]:
     """
     Perform batch lookup of author trust scores from the authors table.
 
-    Executes a single batch query for all unique author usernames and returns
-    a dict mapping username to trust_score. Authors not found in the database
-    receive the default trust score.
+    Stages all unique author usernames in a TEMP table and joins it against
+    the authors table in a single query, returning a dict mapping username to
+    trust_score. Authors not found in the database receive the default trust
+    score.
 
     Args:
         db_connection: SQLite database connection
-        authors: List of author usernames to lookup
+        authors: Author usernames to lookup (any iterable; a set is used as-is)
         default_trust: Default trust score for authors not found (default: 0.5)
 
     Returns:
@@ -131,26 +132,37 @@ def lookup_author_trust_scores(
         >>> scores['[deleted]']  # Returns default for deleted authors
         0.5
     """
-    if not authors:
+    # Deduplicate authors for efficient batch query
+    unique_authors = authors if isinstance(authors, (set, frozenset)) else set(authors)
+    if not unique_authors:
         return {}
 
-    # Deduplicate authors for efficient batch query
-    unique_authors = list(set(authors))
-
-    # Build parameterized query for batch lookup
-    # Use COALESCE to return default_trust if trust_score column is NULL
-    placeholders = ','.join('?' * len(unique_authors))
-    query = f"""
-        SELECT username,
-               COALESCE(trust_score, ?) as trust_score
-        FROM authors
-        WHERE username IN ({placeholders})
+    # Stage usernames in a TEMP table and join against authors, so the query
+    # has one fixed plan and no bound-parameter limit regardless of how many
+    # authors are looked up. The savepoint keeps the staging writes in one
+    # transaction without committing anything the caller has pending.
+    query = """
+        SELECT a.username,
+               COALESCE(a.trust_score, ?) as trust_score
+        FROM _authors t
+        JOIN authors a ON a.username = t.name
     """
 
     # Execute batch query
     try:
-        cursor = db_connection.execute(query, [default_trust] + unique_authors)
-        rows = cursor.fetchall()
+        db_connection.execute("SAVEPOINT author_lookup")
+        try:
+            db_connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS _authors (name TEXT PRIMARY KEY)"
+            )
+            db_connection.execute("DELETE FROM _authors")
+            db_connection.executemany(
+                "INSERT OR IGNORE INTO _authors (name) VALUES (?)",
+                ((author,) for author in unique_authors)
+            )
+            rows = db_connection.execute(query, (default_trust,)).fetchall()
+        finally:
+            db_connection.execute("RELEASE author_lookup")
 
         # Build result dict from query results
         result = {}
@@ -173,7 +185,6 @@ def lookup_author_trust_scores(
 
         logger.debug(
             "Author trust lookup complete",
-            total_requested=len(authors),
             unique_authors=len(unique_authors),
             found_in_db=len(rows),
             defaulted=len(unique_authors) - len(rows)
@@ -0,0 +1,38 @@
+"""Connection PRAGMAs shared by the pipeline scripts.
+
+Every stage that writes to the SQLite database applies the same tuning:
+WAL journaling, synchronous=NORMAL (safe under WAL: a crash cannot corrupt
+the database, only the last commits may be lost on power failure), temp
+tables in memory and a larger page cache and mmap window. Stages pass only
+what differs for them.
+"""
+
+import sqlite3
+from typing import Optional
+
+
+def apply_pragmas(
+    conn: sqlite3.Connection,
+    synchronous: str = "NORMAL",
+    busy_timeout: Optional[int] = None,
+    wal_autocheckpoint: Optional[int] = None,
+) -> None:
+    """Apply the pipeline's connection PRAGMAs to conn.
+
+    journal_mode=WAL goes first since it is persistent on the database file.
+
+    Args:
+        conn: SQLite connection (outside any transaction)
+        synchronous: synchronous level, e.g. "NORMAL" or "OFF"
+        busy_timeout: Milliseconds to wait for a lock (SQLite default if None)
+        wal_autocheckpoint: WAL pages between checkpoints (SQLite default if None)
+    """
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -65536")  # 64 MB
+    conn.execute("PRAGMA mmap_size = 268435456")  # 256 MB
+    if busy_timeout is not None:
+        conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+    if wal_autocheckpoint is not None:
+        conn.execute(f"PRAGMA wal_autocheckpoint = {int(wal_autocheckpoint)}")
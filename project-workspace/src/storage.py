@@ -98,13 +98,37 @@ def check_duplicates(comment_ids: List[str], run_id: int, db_connection: Optiona
     return duplicate_ids
 
 
-def store_posts_and_comments(conn: sqlite3.Connection, run_id: int, posts: List[Dict[str, Any]]) -> None:
+def _serialize_parent_chain(parent_chain: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """Serialize a comment's parent_chain to JSON, or None if it is empty."""
+    if not parent_chain:
+        return None
+    return json.dumps([
+        {
+            'id': entry['id'],
+            'body': entry['body'],
+            'depth': entry['depth'],
+            'author': entry['author']
+        }
+        for entry in parent_chain
+    ])
+
+
+def store_posts_and_comments(
+    conn: sqlite3.Connection,
+    run_id: int,
+    posts: List[Dict[str, Any]],
+    commit: bool = True
+) -> Dict[str, int]:
     """Store Reddit posts and comments with atomic transactions per post.
 
     This function handles Phase 2 storage — ingesting posts and comments from Reddit API
     into the database. Each post is stored in its own transaction. If a post fails,
     it logs an error and continues with the next post.
 
+    When commit=False the caller owns an outer transaction (e.g. store.py
+    commits once per batch of posts); each post is then written inside a
+    SAVEPOINT so a failing post still rolls back on its own.
+
     Post data should include all 8 ProcessedPost fields.
     Comment data should include all 11 ProcessedComment fields.
 
@@ -112,6 +136,11 @@ def store_posts_and_comments(conn: sqlite3.Connection, run_id: int, posts: List[
         conn: SQLite database connection
         run_id: Foreign key to analysis_runs.id
         posts: List of post dicts with 'comments' key containing comment dicts
+        commit: Commit after each post (default). False defers to the caller's transaction.
+
+    Returns:
+        Dict mapping reddit_id to reddit_posts.id for each post stored successfully.
+        Posts whose transaction was rolled back are absent.
 
     Raises:
         Exception: Database operational errors are logged but not raised (graceful degradation)
@@ -141,9 +170,14 @@ def store_posts_and_comments(conn: sqlite3.Connection, run_id: int, posts: List[
         ...     ]
         ... }
         >>> store_posts_and_comments(conn, run_id=1, posts=[post_data])
+        {'abc123': 1}
     """
+    post_db_ids: Dict[str, int] = {}
     for post in posts:
         try:
+            if not commit:
+                conn.execute("SAVEPOINT store_post")
+
             # Insert or get existing post
             # Serialize image_urls list to JSON for storage
             image_urls_raw = post.get('image_urls', [])
@@ -170,31 +204,9 @@ def store_posts_and_comments(conn: sqlite3.Connection, run_id: int, posts: List[
 
             post_db_id = post_cursor.fetchone()[0]
 
-            # Insert comments for this post
-            for comment in post.get('comments', []):
-                # Serialize parent_chain to JSON
-                parent_chain_json = None
-                if 'parent_chain' in comment and comment['parent_chain']:
-                    parent_chain_json = json.dumps([
-                        {
-                            'id': entry['id'],
-                            'body': entry['body'],
-                            'depth': entry['depth'],
-                            'author': entry['author']
-                        }
-                        for entry in comment['parent_chain']
-                    ])
-
-                conn.execute("""
-                    INSERT INTO comments (
-                        analysis_run_id, post_id, reddit_id, author, body, created_utc,
-                        score, depth, prioritization_score, author_trust_score, parent_chain
-                    )
-                    VALUES (?, ?, ?, ?, ?, datetime(?, 'unixepoch'), ?, ?, ?, ?, ?)
-                    ON CONFLICT(reddit_id) DO UPDATE SET
-                        analysis_run_id = excluded.analysis_run_id,
-                        score = excluded.score
-                """, (
+            # Insert comments for this post in one executemany call
+            comment_rows = [
+                (
                     run_id,
                     post_db_id,
                     comment['reddit_id'],
@@ -205,19 +217,41 @@ def store_posts_and_comments(conn: sqlite3.Connection, run_id: int, posts: List[
                     comment['depth'],
                     comment.get('priority_score', 0.0),
                     comment.get('author_trust_score', 0.5),
-                    parent_chain_json
-                ))
-
-            conn.commit()
+                    _serialize_parent_chain(comment.get('parent_chain'))
+                )
+                for comment in post.get('comments', [])
+            ]
+            conn.executemany("""
+                INSERT INTO comments (
+                    analysis_run_id, post_id, reddit_id, author, body, created_utc,
+                    score, depth, prioritization_score, author_trust_score, parent_chain
+                )
+                VALUES (?, ?, ?, ?, ?, datetime(?, 'unixepoch'), ?, ?, ?, ?, ?)
+                ON CONFLICT(reddit_id) DO UPDATE SET
+                    analysis_run_id = excluded.analysis_run_id,
+                    score = excluded.score
+            """, comment_rows)
+
+            if commit:
+                conn.commit()
+            else:
+                conn.execute("RELEASE store_post")
+            post_db_ids[post['reddit_id']] = post_db_id
             logger.info("stored_post_and_comments", reddit_id=post['reddit_id'],
-                       comment_count=len(post.get('comments', [])))
+                       comment_count=len(comment_rows))
 
         except Exception as e:
-            conn.rollback()
+            if commit:
+                conn.rollback()
+            else:
+                conn.execute("ROLLBACK TO store_post")
+                conn.execute("RELEASE store_post")
             logger.error("failed_to_store_post", reddit_id=post.get('reddit_id', 'unknown'),
                         error=str(e))
             # Continue with next post
 
+    return post_db_ids
+
 
 def store_analysis_results(
     conn: sqlite3.Connection,
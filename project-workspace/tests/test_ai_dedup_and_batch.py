@@ -2,12 +2,11 @@
 Tests for AI deduplication and batch processing (stories 003-003, 003-004, 003-007, 003-008).
 
 Behavioral tests for comment deduplication before AI analysis,
-concurrent batch processing with ThreadPoolExecutor, and batch-of-5 commits.
+concurrent batch processing with asyncio.gather, and batch-of-5 commits.
 """
 
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
-from concurrent.futures import ThreadPoolExecutor
 
 
 class TestCommentDeduplicationForAI:
@@ -151,79 +150,145 @@ class TestConcurrentAIBatching:
     """Test concurrent AI request batching (story-003-004)."""
 
     @pytest.mark.asyncio
-    async def test_threadpool_executor_max_workers_5(self):
-        """ThreadPoolExecutor with max_workers=5."""
+    async def test_batch_requests_in_flight_together(self):
+        """All comments in a batch are awaited together on the running loop."""
+        import asyncio
         from src.ai_batch import process_single_batch
-        import concurrent.futures
 
-        comments = [{'reddit_id': f'c{i}', 'body': f'Text {i}'} for i in range(3)]
+        comments = [{'reddit_id': f'c{i}', 'body': f'Text {i}'} for i in range(5)]
 
-        mock_client = MagicMock()
-        mock_client.send_chat_completion = MagicMock(return_value={
-            'content': '{"tickers":[],"ticker_sentiments":[],"sentiment":"neutral","sarcasm_detected":false,"has_reasoning":false,"confidence":0.5,"reasoning_summary":null}',
-            'usage': {'total_tokens': 100}
-        })
+        in_flight = 0
+        max_in_flight = 0
 
-        executor_kwargs = {}
-        _OriginalTPE = concurrent.futures.ThreadPoolExecutor
+        async def mock_send(system_prompt, user_prompt):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {
+                'content': '{"tickers":[],"ticker_sentiments":[],"sentiment":"neutral","sarcasm_detected":false,"has_reasoning":false,"confidence":0.5,"reasoning_summary":null}',
+                'usage': {'total_tokens': 100}
+            }
 
-        class CapturingTPE(_OriginalTPE):
-            def __init__(self, **kwargs):
-                executor_kwargs.update(kwargs)
-                super().__init__(**kwargs)
+        mock_client = AsyncMock()
+        mock_client.send_chat_completion = mock_send
 
-        with patch('concurrent.futures.ThreadPoolExecutor', CapturingTPE):
-            with patch('src.ai_batch.asyncio.new_event_loop') as mock_loop_factory:
-                mock_loop = MagicMock()
-                mock_loop.run_until_complete.return_value = {
-                    'content': '{}',
-                    'usage': {'total_tokens': 100}
-                }
-                mock_loop_factory.return_value = mock_loop
+        with patch('src.ai_batch.asyncio.new_event_loop') as mock_loop_factory:
+            results = await process_single_batch(comments, mock_client, run_id=1)
+
+        # Should overlap all 5 requests without spinning up per-comment loops
+        assert max_in_flight == 5
+        assert len(results) == 5
+        mock_loop_factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_single_batch_caps_requests_in_flight(self):
+        """process_single_batch keeps at most 5 requests in flight for larger lists."""
+        import asyncio
+        from src.ai_batch import process_single_batch
+
+        comments = [{'reddit_id': f'c{i}', 'body': f'Text {i}'} for i in range(8)]
 
-                await process_single_batch(comments, mock_client, run_id=1)
+        in_flight = 0
+        max_in_flight = 0
 
-        # Should create ThreadPoolExecutor with max_workers=5
-        assert executor_kwargs.get('max_workers') == 5
+        async def mock_process(comment, *args, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {'sentiment': 'neutral'}
+
+        with patch('src.ai_batch.process_comment_with_retry', side_effect=mock_process):
+            results = await process_single_batch(comments, MagicMock(), run_id=1)
+
+        assert max_in_flight == 5
+        assert [comment['reddit_id'] for comment, _ in results] == [f'c{i}' for i in range(8)]
 
     @pytest.mark.asyncio
-    async def test_batches_of_5_comments(self):
-        """Comments processed in batches of 5."""
+    async def test_at_most_5_requests_in_flight(self):
+        """No more than 5 comments are analyzed at once across the whole run."""
+        import asyncio
         from src.ai_batch import process_comments_in_batches
 
-        # 12 comments = 3 batches (5, 5, 2)
         comments = [{'reddit_id': f'c{i}', 'body': f'Text {i}'} for i in range(12)]
 
-        batch_sizes = []
+        in_flight = 0
+        max_in_flight = 0
 
-        async def mock_process_batch(batch, *args, **kwargs):
-            batch_sizes.append(len(batch))
-            return []
+        async def mock_process(comment, *args, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {'sentiment': 'neutral'}
 
-        with patch('src.ai_batch.process_single_batch', side_effect=mock_process_batch):
-            await process_comments_in_batches(comments, run_id=1, db_conn=None)
+        with patch('src.ai_batch.process_comment_with_retry', side_effect=mock_process):
+            results = await process_comments_in_batches(comments, run_id=1, db_conn=None)
 
-            # Should have 3 batches: [5, 5, 2]
-            assert batch_sizes == [5, 5, 2]
+        assert max_in_flight == 5
+        assert len(results) == 12
 
     @pytest.mark.asyncio
-    async def test_final_batch_may_be_smaller(self):
-        """Final batch may be smaller than 5."""
+    async def test_slow_comment_does_not_stall_others(self):
+        """A slow request keeps one slot; the remaining comments flow past it."""
+        import asyncio
         from src.ai_batch import process_comments_in_batches
 
-        # 7 comments = 2 batches (5, 2)
+        # 7 comments: one slow request in the first five used to hold back the last two
         comments = [{'reddit_id': f'c{i}', 'body': f'Text {i}'} for i in range(7)]
+        slow_done = asyncio.Event()
+        completed_before_slow = []
 
-        batch_sizes = []
+        async def mock_process(comment, *args, **kwargs):
+            if comment['reddit_id'] == 'c0':
+                await asyncio.sleep(0.05)
+                slow_done.set()
+            else:
+                await asyncio.sleep(0)
+                if not slow_done.is_set():
+                    completed_before_slow.append(comment['reddit_id'])
+            return {'sentiment': 'neutral'}
 
-        async def mock_process_batch(batch, *args, **kwargs):
-            batch_sizes.append(len(batch))
-            return []
+        with patch('src.ai_batch.process_comment_with_retry', side_effect=mock_process):
+            results = await process_comments_in_batches(comments, run_id=1, db_conn=None)
 
-        with patch('src.ai_batch.process_single_batch', side_effect=mock_process_batch):
-            await process_comments_in_batches(comments, run_id=1, db_conn=None)
+        assert sorted(completed_before_slow) == [f'c{i}' for i in range(1, 7)]
+        assert results[-1][0]['reddit_id'] == 'c0'
+
+    @pytest.mark.asyncio
+    async def test_results_streamed_to_queue_as_completed(self):
+        """Each result is put on the queue as soon as its comment completes."""
+        import asyncio
+        from src.ai_batch import process_comments_in_batches
 
-            assert batch_sizes[-1] == 2  # Final batch is 2
+        comments = [{'reddit_id': f'c{i}', 'body': f'Text {i}'} for i in range(7)]
+        queue = asyncio.Queue()
+        queued_before_last = []
+
+        async def mock_process(comment, *args, **kwargs):
+            if comment['reddit_id'] == 'c6':
+                await asyncio.sleep(0.02)
+                queued_before_last.append(queue.qsize())
+            else:
+                await asyncio.sleep(0)
+            if comment['reddit_id'] == 'c3':
+                return None  # Skipped after retries
+            return {'sentiment': 'neutral'}
+
+        with patch('src.ai_batch.process_comment_with_retry', side_effect=mock_process), \
+                patch('structlog.get_logger'):
+            results = await process_comments_in_batches(comments, run_id=1, queue=queue)
+
+        # Every other successful result was queued while c6 was still in flight
+        assert queued_before_last == [5]
+        queued = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert queued == results
+        assert len(queued) == 6
+        assert 'c3' not in [comment['reddit_id'] for comment, _ in queued]
 
     @pytest.mark.asyncio
     async def test_one_comment_per_api_call(self):
@@ -294,7 +359,7 @@ class TestConcurrentAIBatching:
 
     @pytest.mark.asyncio
     async def test_progress_counter_per_batch(self):
-        """Progress counter logged per batch."""
+        """Progress counter logged every 5 completed comments."""
         from src.ai_batch import process_comments_in_batches
 
         comments = [{'reddit_id': f'c{i}', 'body': f'Text {i}'} for i in range(10)]
@@ -303,11 +368,13 @@ class TestConcurrentAIBatching:
             logger_instance = MagicMock()
             mock_logger.return_value = logger_instance
 
-            with patch('src.ai_batch.process_single_batch', return_value=[]):
+            with patch('src.ai_batch.process_comment_with_retry', return_value={'sentiment': 'neutral'}):
                 await process_comments_in_batches(comments, run_id=1, db_conn=None)
 
-                # Should log progress
-                assert logger_instance.info.called
+                # Should log progress after every 5 completed comments
+                progress = [c for c in logger_instance.info.call_args_list
+                            if c[0][0].startswith('Processed ')]
+                assert [c[1]['completed'] for c in progress] == [5, 10]
 
 
 class TestAuthorTrustSnapshot:
@@ -398,7 +465,6 @@ class TestBatchOf5Concurrency:
     async def test_all_5_workers_succeed_results_mapped(self):
         """All 5 workers succeed and results are correctly mapped to source comments."""
         from src.ai_batch import process_single_batch
-        import concurrent.futures
 
         # Exactly 5 comments
         comments = [
@@ -410,7 +476,6 @@ class TestBatchOf5Concurrency:
 
         # Track which comments were processed
         processed_ids = []
-        executor_kwargs = {}
 
         async def mock_send(system_prompt, user_prompt):
             """Mock API response that captures comment ID from prompt."""
@@ -426,19 +491,7 @@ class TestBatchOf5Concurrency:
 
         mock_client.send_chat_completion = mock_send
 
-        # Capture ThreadPoolExecutor kwargs
-        _OriginalTPE = concurrent.futures.ThreadPoolExecutor
-
-        class CapturingTPE(_OriginalTPE):
-            def __init__(self, **kwargs):
-                executor_kwargs.update(kwargs)
-                super().__init__(**kwargs)
-
-        with patch('concurrent.futures.ThreadPoolExecutor', CapturingTPE):
-            results = await process_single_batch(comments, mock_client, run_id=1)
-
-        # Verify ThreadPoolExecutor created with max_workers=5
-        assert executor_kwargs.get('max_workers') == 5
+        results = await process_single_batch(comments, mock_client, run_id=1)
 
         # Verify all 5 workers completed
         assert len(results) == 5
@@ -512,23 +565,28 @@ class TestBatchOf5Concurrency:
                 return super().__getitem__(key)
 
         class MockCursor:
-            def __init__(self, sql):
+            def __init__(self, sql, params=None):
                 self.sql = sql
+                self.params = params
 
-            def fetchone(self):
-                # Return appropriate mock data based on query
-                if 'SELECT id, author_trust_score FROM comments' in self.sql:
-                    # For dedup check - return None (comment doesn't exist)
-                    return None
-                elif 'SELECT id FROM comments WHERE reddit_id' in self.sql:
-                    # For ticker junction insert - return comment_id
-                    return MockRow({'id': 123})
-                return None
+            def fetchall(self):
+                if 'SELECT reddit_id, id FROM comments' in self.sql:
+                    # For ticker junction insert - return comment ids
+                    return [MockRow({'reddit_id': rid, 'id': 123}) for rid in self.params]
+                # Batched dedup check - no comments exist yet
+                return []
 
         class MockConnection:
+            in_transaction = False
+
             def execute(self, sql, params=None):
                 if sql.strip().startswith('INSERT') or sql.strip().startswith('UPDATE'):
                     insert_calls.append(('execute', sql))
+                return MockCursor(sql, params)
+
+            def executemany(self, sql, seq_of_params):
+                for _ in seq_of_params:
+                    insert_calls.append(('executemany', sql))
                 return MockCursor(sql)
 
             def commit(self):
@@ -689,3 +747,163 @@ class TestBatchOf5CommitTransaction:
             SELECT COUNT(*) FROM comments WHERE reddit_id LIKE 'partial_%'
         """).fetchone()[0]
         assert count == 3
+
+    def test_bad_created_utc_stored_as_null(self, seeded_db):
+        """Unconvertible created_utc stores NULL instead of failing the batch."""
+        from src.ai_batch import commit_analysis_batch
+
+        seeded_db.execute("INSERT INTO analysis_runs (status, started_at) VALUES ('running', datetime('now'))")
+        run_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        seeded_db.execute("""
+            INSERT INTO reddit_posts (reddit_id, title, selftext, upvotes, total_comments, fetched_at)
+            VALUES ('post1', 'Test', 'Body', 100, 50, datetime('now'))
+        """)
+        post_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        results = [
+            {
+                'reddit_id': reddit_id,
+                'post_id': post_id,
+                'author': 'user',
+                'body': 'Text',
+                'created_utc': created_utc,
+                'sentiment': 'neutral',
+                'ai_confidence': 0.5,
+                'tickers': []
+            }
+            for reddit_id, created_utc in [('bad_ts', 'abc'), ('huge_ts', 1e20), ('good_ts', 0)]
+        ]
+
+        commit_analysis_batch(seeded_db, run_id, results)
+
+        rows = dict(seeded_db.execute("""
+            SELECT reddit_id, created_utc FROM comments WHERE reddit_id LIKE '%_ts'
+        """).fetchall())
+        assert rows == {'bad_ts': None, 'huge_ts': None, 'good_ts': '1970-01-01 00:00:00'}
+
+    def test_batch_tickers_use_batched_id_lookup(self, seeded_db):
+        """Comment ids for ticker rows come from one batched query, not one per comment."""
+        from src.ai_batch import commit_analysis_batch
+
+        seeded_db.execute("INSERT INTO analysis_runs (status, started_at) VALUES ('running', datetime('now'))")
+        run_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        seeded_db.execute("""
+            INSERT INTO reddit_posts (reddit_id, title, selftext, upvotes, total_comments, fetched_at)
+            VALUES ('post1', 'Test', 'Body', 100, 50, datetime('now'))
+        """)
+        post_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+        seeded_db.commit()
+
+        results = [
+            {
+                'reddit_id': f'tick_{i}',
+                'post_id': post_id,
+                'author': f'user{i}',
+                'body': f'Text {i}',
+                'sentiment': 'bullish',
+                'ai_confidence': 0.8,
+                'tickers': ['aapl', 'tsla'],
+                'ticker_sentiments': ['bullish', 'bearish']
+            }
+            for i in range(5)
+        ]
+
+        statements = []
+        seeded_db.set_trace_callback(statements.append)
+        commit_analysis_batch(seeded_db, run_id, results)
+        seeded_db.set_trace_callback(None)
+
+        assert statements[0] == 'BEGIN IMMEDIATE'
+        per_row_lookups = [sql for sql in statements if 'WHERE reddit_id = ' in sql]
+        assert per_row_lookups == []
+
+        rows = seeded_db.execute("""
+            SELECT c.reddit_id, ct.ticker, ct.sentiment
+            FROM comment_tickers ct JOIN comments c ON c.id = ct.comment_id
+            WHERE c.reddit_id LIKE 'tick_%'
+            ORDER BY c.reddit_id, ct.ticker
+        """).fetchall()
+        assert len(rows) == 10
+        assert (rows[0]['ticker'], rows[0]['sentiment']) == ('AAPL', 'bullish')
+        assert (rows[1]['ticker'], rows[1]['sentiment']) == ('TSLA', 'bearish')
+
+    def test_store_analysis_results_returns_id_map(self, seeded_db):
+        """store_analysis_results maps reddit_id to comments.id for updated and new rows."""
+        from src.ai_batch import store_analysis_results
+
+        seeded_db.execute("INSERT INTO analysis_runs (status, started_at) VALUES ('running', datetime('now'))")
+        run_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        seeded_db.execute("""
+            INSERT INTO reddit_posts (reddit_id, title, selftext, upvotes, total_comments, fetched_at)
+            VALUES ('post1', 'Test', 'Body', 100, 50, datetime('now'))
+        """)
+        post_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        seeded_db.execute("""
+            INSERT INTO comments (analysis_run_id, post_id, reddit_id, author, body, created_utc, score, depth, author_trust_score)
+            VALUES (?, ?, 'existing', 'user', 'Text', datetime('now'), 10, 0, 0.75)
+        """, (run_id, post_id))
+
+        results = [
+            {'reddit_id': 'existing', 'post_id': post_id, 'sentiment': 'bullish', 'ai_confidence': 0.9},
+            {'reddit_id': 'new', 'post_id': post_id, 'sentiment': 'bearish', 'ai_confidence': 0.6},
+        ]
+
+        statements = []
+        seeded_db.set_trace_callback(statements.append)
+        id_map = store_analysis_results(seeded_db, run_id, results)
+        seeded_db.set_trace_callback(None)
+
+        expected = dict(seeded_db.execute(
+            "SELECT reddit_id, id FROM comments WHERE reddit_id IN ('existing', 'new')"
+        ).fetchall())
+        assert id_map == expected
+
+        # The updated row's id comes from the existence check; only 'new' is re-queried
+        lookups = [sql for sql in statements if sql.lstrip().startswith('SELECT reddit_id, id FROM')]
+        assert lookups == ["SELECT reddit_id, id FROM comments WHERE reddit_id IN ('new')"]
+
+    def test_deferred_commit_rolls_back_only_failed_batch(self, seeded_db):
+        """commit=False writes each batch in a savepoint inside the caller's transaction."""
+        from src.ai_batch import commit_analysis_batch
+
+        seeded_db.execute("INSERT INTO analysis_runs (status, started_at) VALUES ('running', datetime('now'))")
+        run_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        seeded_db.execute("""
+            INSERT INTO reddit_posts (reddit_id, title, selftext, upvotes, total_comments, fetched_at)
+            VALUES ('post1', 'Test', 'Body', 100, 50, datetime('now'))
+        """)
+        post_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+        seeded_db.commit()
+
+        good = [
+            {
+                'reddit_id': f'deferred_{i}',
+                'post_id': post_id,
+                'author': f'user{i}',
+                'body': f'Text {i}',
+                'sentiment': 'neutral',
+                'ai_confidence': 0.5,
+                'tickers': []
+            }
+            for i in range(5)
+        ]
+        bad = [dict(good[0], reddit_id='deferred_bad', post_id=99999)]
+
+        seeded_db.execute("BEGIN IMMEDIATE")
+        commit_analysis_batch(seeded_db, run_id, good, commit=False)
+        with patch('structlog.get_logger'):
+            commit_analysis_batch(seeded_db, run_id, bad, commit=False)
+
+        # Nothing committed yet; the outer transaction is still open
+        assert seeded_db.in_transaction
+        seeded_db.commit()
+
+        count = seeded_db.execute("""
+            SELECT COUNT(*) FROM comments WHERE reddit_id LIKE 'deferred_%'
+        """).fetchone()[0]
+        assert count == 5
@@ -233,6 +233,15 @@ class TestAIResponseParsing:
         with pytest.raises(Exception):
             parse_ai_response(missing)
 
+    def test_structured_output_schema_matches_parser(self):
+        """AI_RESPONSE_SCHEMA requires exactly the fields the parser validates."""
+        from src.ai_parser import AI_RESPONSE_SCHEMA, REQUIRED_FIELDS
+
+        assert AI_RESPONSE_SCHEMA["required"] == REQUIRED_FIELDS
+        assert set(AI_RESPONSE_SCHEMA["properties"]) == set(REQUIRED_FIELDS)
+        # Strict mode needs every property required and no extras allowed
+        assert AI_RESPONSE_SCHEMA["additionalProperties"] is False
+
 
 class TestTickerNormalization:
     """Test ticker normalization (story-003-005)."""
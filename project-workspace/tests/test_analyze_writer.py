@@ -0,0 +1,160 @@
+"""
+Tests for the analyze stage result writer (scripts/pipeline/analyze.py).
+
+The writer drains (comment, result) pairs from a queue and flushes them to
+SQLite by size, by time, and once more on the None sentinel.
+"""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from scripts.pipeline import analyze
+
+
+def _pair(i):
+    """A to_analyze.json comment and its parsed AI result."""
+    comment = {
+        "reddit_id": f"c{i}", "post_db_id": 1, "author": f"user{i}",
+        "body": f"Text {i}", "author_trust_score": 0.5, "score": 3, "depth": 0,
+        "created_utc": 1700000000, "prioritization_score": 1.5,
+    }
+    result = {
+        "sentiment": "bullish", "sarcasm_detected": False, "has_reasoning": True,
+        "reasoning_summary": "Price target", "confidence": 0.8,
+        "tickers": ["AAPL"], "ticker_sentiments": ["bullish"],
+    }
+    return comment, result
+
+
+@pytest.fixture
+def flushes():
+    """Record the size and thread of each _store_results call."""
+    calls = []
+
+    def record(conn, run_id, pending, prompt_config_id):
+        calls.append((len(pending), threading.get_ident()))
+
+    with patch.object(analyze, "_store_results", record):
+        yield calls
+
+
+@pytest.mark.asyncio
+async def test_flushes_every_write_flush_size_results(flushes):
+    """Full batches flush as they fill; the remainder flushes on the sentinel."""
+    queue = asyncio.Queue()
+    for i in range(7):
+        queue.put_nowait(_pair(i))
+    queue.put_nowait(None)
+
+    with patch.object(analyze, "WRITE_FLUSH_SIZE", 3), \
+            patch.object(analyze, "WRITE_FLUSH_SECONDS", 60.0):
+        await analyze._writer(None, 1, queue, None)
+
+    assert [size for size, _ in flushes] == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_write_flush_seconds(flushes):
+    """A partial batch is written once WRITE_FLUSH_SECONDS pass, before the sentinel."""
+    queue = asyncio.Queue()
+    with patch.object(analyze, "WRITE_FLUSH_SIZE", 100), \
+            patch.object(analyze, "WRITE_FLUSH_SECONDS", 0.05):
+        writer = asyncio.create_task(analyze._writer(None, 1, queue, None))
+        await queue.put(_pair(0))
+        await queue.put(_pair(1))
+        await asyncio.sleep(0.2)
+        assert [size for size, _ in flushes] == [2]
+
+        await queue.put(None)
+        await writer
+
+    assert [size for size, _ in flushes] == [2]
+
+
+@pytest.mark.asyncio
+async def test_sentinel_flushes_pending_results(flushes):
+    """Results still pending when None arrives are written before the writer exits."""
+    queue = asyncio.Queue()
+    queue.put_nowait(_pair(0))
+    queue.put_nowait(_pair(1))
+    queue.put_nowait(None)
+
+    with patch.object(analyze, "WRITE_FLUSH_SECONDS", 60.0):
+        await analyze._writer(None, 1, queue, None)
+
+    assert [size for size, _ in flushes] == [2]
+
+
+@pytest.mark.asyncio
+async def test_sentinel_with_nothing_pending_writes_nothing(flushes):
+    """An empty queue ends without a flush."""
+    queue = asyncio.Queue()
+    queue.put_nowait(None)
+
+    await analyze._writer(None, 1, queue, None)
+
+    assert flushes == []
+
+
+@pytest.mark.asyncio
+async def test_flush_runs_off_the_event_loop_thread(flushes):
+    """Database writes happen in a worker thread, not on the loop."""
+    queue = asyncio.Queue()
+    queue.put_nowait(_pair(0))
+    queue.put_nowait(None)
+
+    await analyze._writer(None, 1, queue, None)
+
+    assert flushes[0][1] != threading.get_ident()
+
+
+def test_merge_result_maps_keys_for_commit_analysis_batch():
+    """post_db_id becomes post_id and confidence becomes ai_confidence."""
+    comment, result = _pair(7)
+
+    merged = analyze._merge_result(comment, result)
+
+    assert merged == {
+        "reddit_id": "c7", "post_id": 1, "author": "user7", "body": "Text 7",
+        "author_trust_score": 0.5, "score": 3, "depth": 0,
+        "created_utc": 1700000000, "prioritization_score": 1.5,
+        "sentiment": "bullish", "sarcasm_detected": False, "has_reasoning": True,
+        "reasoning_summary": "Price target", "ai_confidence": 0.8,
+        "tickers": ["AAPL"], "ticker_sentiments": ["bullish"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_writer_stores_results_in_database(seeded_db, temp_db_path):
+    """With the real _store_results, flushed comments and tickers land in SQLite."""
+    seeded_db.execute("INSERT INTO analysis_runs (status, started_at) VALUES ('running', datetime('now'))")
+    run_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+    seeded_db.execute("""
+        INSERT INTO reddit_posts (reddit_id, title, selftext, upvotes, total_comments, fetched_at)
+        VALUES ('post1', 'Test', 'Body', 100, 50, datetime('now'))
+    """)
+    post_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+    seeded_db.commit()
+
+    queue = asyncio.Queue()
+    for i in range(3):
+        comment, result = _pair(i)
+        comment["post_db_id"] = post_id
+        queue.put_nowait((comment, result))
+    queue.put_nowait(None)
+
+    conn = analyze.open_db(temp_db_path)
+    await analyze._writer(conn, run_id, queue, None)
+    conn.close()
+
+    rows = seeded_db.execute("""
+        SELECT c.reddit_id, ct.ticker FROM comments c
+        JOIN comment_tickers ct ON ct.comment_id = c.id
+        ORDER BY c.reddit_id
+    """).fetchall()
+    assert [(r["reddit_id"], r["ticker"]) for r in rows] == [
+        ("c0", "AAPL"), ("c1", "AAPL"), ("c2", "AAPL"),
+    ]
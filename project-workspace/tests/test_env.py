@@ -0,0 +1,87 @@
+"""
+Tests for the shared .env loader (src/env.py).
+"""
+
+import os
+from unittest.mock import patch
+
+
+def test_loads_values_without_overriding_environment(tmp_path, monkeypatch):
+    """KEY=VALUE lines are loaded; comments skipped; existing vars win."""
+    from src import env
+
+    env_file = tmp_path / ".env"
+    env_file.write_text("# comment\n\nWSB_TEST_NEW = abc\nWSB_TEST_SET=from_file\n")
+    monkeypatch.delenv("WSB_TEST_NEW", raising=False)
+    monkeypatch.setenv("WSB_TEST_SET", "from_shell")
+
+    env.load_dotenv_once.cache_clear()
+    env.load_dotenv_once(str(env_file))
+
+    assert os.environ["WSB_TEST_NEW"] == "abc"
+    assert os.environ["WSB_TEST_SET"] == "from_shell"
+    monkeypatch.delenv("WSB_TEST_NEW")
+
+
+def test_fallback_parser_handles_equals_and_crlf(tmp_path, monkeypatch):
+    """Without python-dotenv, values keep inner '=' and lose trailing CR/space."""
+    from src import env
+
+    env_file = tmp_path / ".env"
+    env_file.write_bytes(b"WSB_TEST_URL=postgres://h/db?a=b \r\n  # WSB_TEST_SKIP=1\r\n")
+    monkeypatch.delenv("WSB_TEST_URL", raising=False)
+    monkeypatch.delenv("WSB_TEST_SKIP", raising=False)
+
+    env.load_dotenv_once.cache_clear()
+    with patch.object(env, "load_dotenv", None):
+        env.load_dotenv_once(str(env_file))
+
+    assert os.environ["WSB_TEST_URL"] == "postgres://h/db?a=b"
+    assert "WSB_TEST_SKIP" not in os.environ
+    monkeypatch.delenv("WSB_TEST_URL")
+
+
+def test_fallback_parser_strips_matching_quotes(tmp_path, monkeypatch):
+    """Without python-dotenv, quoted values lose their quotes like they do with it."""
+    from src import env
+
+    env_file = tmp_path / ".env"
+    env_file.write_text("WSB_TEST_DQ=\"a b\"\nWSB_TEST_SQ='c'\nWSB_TEST_MIXED=\"d'\n")
+    for key in ("WSB_TEST_DQ", "WSB_TEST_SQ", "WSB_TEST_MIXED"):
+        monkeypatch.delenv(key, raising=False)
+
+    env.load_dotenv_once.cache_clear()
+    with patch.object(env, "load_dotenv", None):
+        env.load_dotenv_once(str(env_file))
+
+    assert os.environ["WSB_TEST_DQ"] == "a b"
+    assert os.environ["WSB_TEST_SQ"] == "c"
+    assert os.environ["WSB_TEST_MIXED"] == "\"d'"
+    for key in ("WSB_TEST_DQ", "WSB_TEST_SQ", "WSB_TEST_MIXED"):
+        monkeypatch.delenv(key)
+
+
+def test_file_read_once_per_process(tmp_path):
+    """Repeat calls hit the cache instead of re-reading the file."""
+    from src import env
+
+    env_file = tmp_path / ".env"
+    env_file.write_text("WSB_TEST_ONCE=1\n")
+
+    env.load_dotenv_once.cache_clear()
+    try:
+        with patch.object(env, "load_dotenv", None), \
+             patch("builtins.open", wraps=open) as mock_open:
+            env.load_dotenv_once(str(env_file))
+            env.load_dotenv_once(str(env_file))
+        assert mock_open.call_count == 1
+    finally:
+        os.environ.pop("WSB_TEST_ONCE", None)
+
+
+def test_missing_file_is_ignored(tmp_path):
+    """No .env file is not an error."""
+    from src import env
+
+    env.load_dotenv_once.cache_clear()
+    env.load_dotenv_once(str(tmp_path / "missing.env"))
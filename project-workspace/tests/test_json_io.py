@@ -0,0 +1,119 @@
+"""
+Tests for the pipeline JSON file helpers (src/json_io.py).
+
+Both the orjson path and the stdlib fallback must produce files the other
+stages can read back unchanged.
+"""
+
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_io(request):
+    """Yield the json_io module with orjson enabled or forced off."""
+    import src.json_io as module
+
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        yield module
+    else:
+        with patch.object(module, "orjson", None):
+            yield module
+
+
+def test_round_trip_preserves_data(json_io, tmp_path):
+    """Data written with dump_json loads back identically."""
+    path = str(tmp_path / "stage.json")
+    data = {"metadata": {"run_id": 1}, "posts": [{"reddit_id": "abc", "score": 1.5, "body": "🚀 TSLA"}]}
+
+    json_io.dump_json(data, path)
+
+    assert json_io.load_json(path) == data
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == data
+
+
+def test_compact_output_has_no_whitespace(json_io, tmp_path):
+    """indent=False writes the same data with no indentation or spacing."""
+    path = str(tmp_path / "stage.json")
+    data = {"metadata": {"run_id": 1}, "comments": [{"reddit_id": "c1", "score": 2}]}
+
+    json_io.dump_json(data, path, indent=False)
+
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert text == '{"metadata":{"run_id":1},"comments":[{"reddit_id":"c1","score":2}]}'
+
+
+def test_unserializable_values_written_as_str(json_io, tmp_path):
+    """Values without a JSON type fall back to a string, like default=str."""
+    path = str(tmp_path / "stage.json")
+
+    json_io.dump_json({"value": Decimal("1.25")}, path)
+
+    assert json_io.load_json(path)["value"] == "1.25"
+
+
+def test_dataclasses_serialized_like_asdict(json_io, tmp_path):
+    """Dataclasses serialize to their declared fields only, same as asdict()."""
+    from dataclasses import asdict
+    from src.models.reddit_models import ProcessedPost, ProcessedComment, ParentChainEntry
+
+    comment = ProcessedComment(
+        reddit_id="c1", post_id="p1", author="a", body="TSLA", score=3, depth=1,
+        created_utc=1, parent_chain=[ParentChainEntry(id="c0", body="x", depth=0, author="b")],
+    )
+    comment.engagement_normalized = 0.7  # scratch attribute, not a field
+    post = ProcessedPost(reddit_id="p1", title="T", selftext="", upvotes=1,
+                         total_comments=1, comments=[comment])
+    path = str(tmp_path / "stage.json")
+
+    json_io.dump_json({"posts": [post]}, path)
+
+    assert json_io.load_json(path) == {"posts": [asdict(post)]}
+
+
+def test_datetimes_written_as_iso_8601(json_io, tmp_path):
+    """Both backends write aware datetimes in the same isoformat() form."""
+    from datetime import datetime, timezone
+
+    created_at = datetime(2026, 2, 12, 10, 0, 0, 123456, tzinfo=timezone.utc)
+    path = str(tmp_path / "stage.json")
+
+    json_io.dump_json({"created_at": created_at}, path)
+
+    assert json_io.load_json(path)["created_at"] == created_at.isoformat()
+
+
+def test_dumps_line_writes_one_jsonl_record(json_io):
+    """dumps_line returns a single newline-terminated UTF-8 JSON record."""
+    entry = {"reddit_id": "c1", "result": {"tickers": [["TSLA", "bullish"]]}, "body": "🚀", "cost": Decimal("0.5")}
+
+    line = json_io.dumps_line(entry)
+
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert json.loads(line) == {**entry, "cost": "0.5"}
+
+
+@pytest.mark.parametrize("backend", ["ijson", "load_json"])
+def test_stream_json_yields_header_and_items(backend, tmp_path):
+    """stream_json returns the header and iterates the array in file order."""
+    import src.json_io as module
+
+    path = str(tmp_path / "scored.json")
+    data = {"metadata": {"run_id": 7}, "posts": [{"reddit_id": "a", "score": 1.5}, {"reddit_id": "b", "score": 2.0}]}
+    module.dump_json(data, path)
+
+    if backend == "ijson":
+        pytest.importorskip("ijson")
+        header, items = module.stream_json(path, "metadata", "posts")
+    else:
+        with patch.object(module, "ijson", None):
+            header, items = module.stream_json(path, "metadata", "posts")
+
+    assert header == data["metadata"]
+    assert list(items) == data["posts"]
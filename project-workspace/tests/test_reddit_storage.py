@@ -262,6 +262,58 @@ class TestPostAndCommentStorage:
             row = seeded_db.execute("SELECT * FROM reddit_posts WHERE reddit_id = 'good_post'").fetchone()
             assert row is not None
 
+    def test_returns_db_ids_of_stored_posts(self, seeded_db):
+        """Returns reddit_id -> reddit_posts.id for stored posts, skipping failed ones."""
+        from src.storage import store_posts_and_comments
+
+        seeded_db.execute("INSERT INTO analysis_runs (status, started_at) VALUES ('running', datetime('now'))")
+        run_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        good = {
+            'reddit_id': 'id_map_post', 'title': 'Good', 'selftext': '', 'upvotes': 1,
+            'total_comments': 0, 'image_urls': [], 'image_analysis': None, 'comments': []
+        }
+        bad = {'reddit_id': 'missing_fields_post'}  # KeyError on title -> rolled back
+
+        post_db_ids = store_posts_and_comments(seeded_db, run_id, [good, bad])
+
+        row = seeded_db.execute("SELECT id FROM reddit_posts WHERE reddit_id = 'id_map_post'").fetchone()
+        assert post_db_ids == {'id_map_post': row['id']}
+
+    def test_deferred_commit_rolls_back_only_failed_post(self, seeded_db):
+        """With commit=False a failing post is undone without ending the caller's transaction."""
+        from src.storage import store_posts_and_comments
+
+        seeded_db.execute("INSERT INTO analysis_runs (status, started_at) VALUES ('running', datetime('now'))")
+        run_id = seeded_db.execute("SELECT last_insert_rowid()").fetchone()[0]
+        seeded_db.commit()
+
+        good = {
+            'reddit_id': 'deferred_post', 'title': 'Good', 'selftext': '', 'upvotes': 1,
+            'total_comments': 1, 'image_urls': [], 'image_analysis': None,
+            'comments': [{
+                'reddit_id': 'deferred_comment', 'author': 'a', 'body': 'TSLA',
+                'created_utc': 1700000000, 'score': 1, 'depth': 0, 'parent_chain': []
+            }]
+        }
+        bad = {
+            'reddit_id': 'bad_post', 'title': 'Bad', 'selftext': '', 'upvotes': 1,
+            'total_comments': 1, 'image_urls': [], 'image_analysis': None,
+            'comments': [{'reddit_id': 'bad_comment'}]  # missing fields -> KeyError
+        }
+
+        seeded_db.execute("BEGIN")
+        post_db_ids = store_posts_and_comments(seeded_db, run_id, [good, bad], commit=False)
+        assert seeded_db.in_transaction
+        seeded_db.commit()
+
+        assert set(post_db_ids) == {'deferred_post'}
+        posts = {r['reddit_id'] for r in seeded_db.execute("SELECT reddit_id FROM reddit_posts")}
+        assert 'deferred_post' in posts and 'bad_post' not in posts
+        comment = seeded_db.execute(
+            "SELECT post_id FROM comments WHERE reddit_id = 'deferred_comment'").fetchone()
+        assert comment['post_id'] == post_db_ids['deferred_post']
+
     def test_reddit_outage_logs_error_returns_503(self):
         """Reddit outage (RedditAPIError) is raised by fetch layer, not storage."""
         from src.reddit import RedditAPIError, fetch_hot_posts
@@ -156,6 +156,29 @@ class TestAuthorTrustLookup:
         assert scores['unknown1'] == 0.5
         assert scores['unknown2'] == 0.5
 
+    def test_large_batch_lookup_leaves_no_open_transaction(self, seeded_db):
+        """Lookups beyond the bound-parameter limit work and commit nothing for the caller."""
+        import sqlite3
+        from src.scoring import lookup_author_trust_scores
+
+        # Classic SQLite default; builds vary, so pin it for the test
+        seeded_db.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+        seeded_db.execute("""
+            INSERT INTO authors (username, total_comments, high_quality_comments,
+                               avg_sentiment_accuracy, first_seen, last_active, trust_score)
+            VALUES ('known_user', 100, 90, 0.85, datetime('now'), datetime('now'), 0.9)
+        """)
+        seeded_db.commit()
+
+        authors = ['known_user'] + [f'user_{i}' for i in range(2000)]
+        scores = lookup_author_trust_scores(seeded_db, authors)
+
+        assert len(scores) == 2001
+        assert scores['known_user'] == 0.9
+        assert scores['user_1999'] == 0.5
+        assert not seeded_db.in_transaction
+
 
 class TestEngagementAndDepthScoring:
     """Test engagement and depth scoring (story-002-006)."""
@@ -91,6 +91,126 @@ class TestSeedDataScript:
         assert count > 0, "Seed data should have created records"
 
 
+class TestSeedConnection:
+    """Verify connect_db PRAGMAs and the bulk insert helper."""
+
+    @pytest.mark.parametrize("unsafe, expected", [(None, 1), ("1", 0)])
+    def test_synchronous_off_only_with_seed_unsafe(self, temp_db_path, monkeypatch, unsafe, expected):
+        """synchronous is NORMAL (1) by default and OFF (0) with SEED_UNSAFE=1."""
+        sys.path.insert(0, str(_PROJECT_DIR))
+        try:
+            from scripts.seed_data import connect_db
+        finally:
+            sys.path.pop(0)
+
+        if unsafe is None:
+            monkeypatch.delenv("SEED_UNSAFE", raising=False)
+        else:
+            monkeypatch.setenv("SEED_UNSAFE", unsafe)
+
+        conn = connect_db(temp_db_path)
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == expected
+        conn.close()
+
+
+    def test_insert_values_chunks_under_parameter_limit(self):
+        """Multi-row VALUES inserts split rows so no statement exceeds 999 parameters."""
+        sys.path.insert(0, str(_PROJECT_DIR))
+        try:
+            from scripts.seed_data import _insert_values
+        finally:
+            sys.path.pop(0)
+
+        conn = sqlite3.connect(":memory:")
+        conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        conn.execute("CREATE TABLE t (a INTEGER, b TEXT, c TEXT)")
+        rows = [(i, f"b{i}", "c") for i in range(700)]  # 2100 parameters
+
+        _insert_values(conn.cursor(), "INSERT INTO t (a, b, c) VALUES ", "(?, ?, ?)", rows)
+
+        assert conn.execute("SELECT COUNT(*), SUM(a) FROM t").fetchone() == (700, sum(range(700)))
+        conn.close()
+
+
+class TestSeedMainTransaction:
+    """Verify main() seeds everything in one transaction."""
+
+    @pytest.fixture
+    def base_db(self, temp_db_path, monkeypatch):
+        """Database with schema and base seed only, selected via DB_PATH."""
+        from tests.conftest import _load_schema, _load_seed
+
+        conn = sqlite3.connect(temp_db_path)
+        _load_schema(conn)
+        _load_seed(conn)
+        conn.close()
+        monkeypatch.setenv("DB_PATH", temp_db_path)
+        sys.path.insert(0, str(_PROJECT_DIR))
+        yield temp_db_path
+        sys.path.remove(str(_PROJECT_DIR))
+
+    def test_main_commits_all_stages(self, base_db):
+        """main() commits every stage's rows."""
+        from scripts.seed_data import main
+
+        assert main() == 0
+
+        conn = sqlite3.connect(base_db)
+        assert conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0] >= 10
+        assert conn.execute("SELECT COUNT(*) FROM price_history").fetchone()[0] >= 50
+        conn.close()
+
+    def test_main_rerun_is_a_no_op(self, base_db):
+        """A second main() run detects the seed and inserts nothing."""
+        from scripts.seed_data import main
+
+        assert main() == 0
+        conn = sqlite3.connect(base_db)
+        first = conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+        conn.close()
+
+        assert main() == 0
+
+        conn = sqlite3.connect(base_db)
+        assert conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0] == first
+        conn.close()
+
+    def test_main_rolls_back_everything_on_error(self, base_db):
+        """A failure in the last stage leaves no partially seeded tables."""
+        from unittest.mock import patch
+        import scripts.seed_data as seed_data
+
+        with patch.object(seed_data, "seed_price_history", side_effect=sqlite3.OperationalError("boom")):
+            assert seed_data.main() == 1
+
+        conn = sqlite3.connect(base_db)
+        assert conn.execute("SELECT COUNT(*) FROM authors").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 0
+        conn.close()
+
+    def test_main_rolls_back_on_foreign_key_violation(self, base_db):
+        """Orphaned rows fail the post-seed foreign_key_check and roll back."""
+        from unittest.mock import patch
+        import scripts.seed_data as seed_data
+
+        real_seed_price_history = seed_data.seed_price_history
+
+        def seed_with_orphan(conn, commit=True, cursor=None):
+            conn.execute(
+                "INSERT INTO comment_tickers (comment_id, ticker, sentiment, created_at) "
+                "VALUES (999999, 'NVDA', 'bullish', datetime('now'))"
+            )
+            return real_seed_price_history(conn, commit=commit, cursor=cursor)
+
+        with patch.object(seed_data, "seed_price_history", side_effect=seed_with_orphan):
+            assert seed_data.main() == 1
+
+        conn = sqlite3.connect(base_db)
+        assert conn.execute("SELECT COUNT(*) FROM comment_tickers").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM authors").fetchone()[0] == 0
+        conn.close()
+
+
 class TestAnalysisRunsSeeding:
     """Verify analysis runs are created."""
 
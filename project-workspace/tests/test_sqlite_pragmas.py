@@ -0,0 +1,34 @@
+"""
+Tests for the shared connection PRAGMA helper (src/sqlite_pragmas.py).
+"""
+
+import sqlite3
+
+
+def test_applies_defaults(temp_db_path):
+    """WAL, synchronous=NORMAL and in-memory temp store; optional PRAGMAs untouched."""
+    from src.sqlite_pragmas import apply_pragmas
+
+    conn = sqlite3.connect(temp_db_path)
+    default_checkpoint = conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0]
+    apply_pragmas(conn)
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+    assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == default_checkpoint
+    conn.close()
+
+
+def test_applies_stage_overrides(temp_db_path):
+    """synchronous, busy_timeout and wal_autocheckpoint follow the arguments."""
+    from src.sqlite_pragmas import apply_pragmas
+
+    conn = sqlite3.connect(temp_db_path)
+    apply_pragmas(conn, synchronous="OFF", busy_timeout=5000, wal_autocheckpoint=1000)
+
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0  # OFF
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 1000
+    conn.close()